@@ -0,0 +1,110 @@
+"""
+Album time-to-tweet benchmark.
+
+Runs ChannelMirror.execute_album_post against stubbed Telegram/Twitter
+calls with fixed per-item latencies and compares it with the old serial flow
+(download every item, then upload every item).
+
+    python -m benchmarks.bench_album_pipeline [--items 10 --download 0.4 --upload 0.6]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import types
+
+for key, value in {
+    "TELEGRAM_API_ID": "1", "TELEGRAM_CHANNEL_ID": "-1001", "ADMIN_USER_ID": "1",
+}.items():
+    os.environ.setdefault(key, value)
+
+from core.env_loader import Config
+from telegram.mirror import ChannelMirror
+from utils.id_storage import IDStorage
+from utils.media_buffer import MemoryBudget
+from utils.media_cache import MediaCache
+
+class StubClient:
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def download_media(self, message, file=None):
+        await asyncio.sleep(self.latency)
+        file.write(b"\0" * 1024)
+        return file
+
+class StubUploader:
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def upload_file(self, buffer, priority=None):
+        await asyncio.sleep(self.latency)
+        return buffer.name
+
+class StubTwitter:
+    def __init__(self, latency):
+        self.uploader = StubUploader(latency)
+
+    async def post_tweet(self, text, **kwargs):
+        return "1"
+
+def build_listener(args, tmp):
+    Config.ensure_dirs()
+    listener = ChannelMirror.__new__(ChannelMirror)
+    listener.bot = types.SimpleNamespace(
+        client=StubClient(args.download),
+        download_slots=asyncio.Semaphore(Config.DOWNLOAD_CONCURRENCY),
+        memory_budget=MemoryBudget(Config.MEDIA_MEMORY_BUDGET),
+        fast_downloader=None, preprocessor=None, is_paused=False,
+    )
+    listener.twitter = StubTwitter(args.upload)
+    listener.storage = IDStorage(os.path.join(tmp, "bench.db"))
+    listener.total_tweets = 0
+    listener.upload_slots = asyncio.Semaphore(Config.UPLOAD_CONCURRENCY)
+    listener.media_cache = MediaCache(os.path.join(tmp, "cache"))
+    return listener
+
+def make_album(count):
+    return [
+        types.SimpleNamespace(
+            id=i, media=True, raw_text="caption" if i == 1 else "", is_reply=False,
+            file=types.SimpleNamespace(name=f"{i}.jpg", ext=".jpg", size=1024)
+        )
+        for i in range(1, count + 1)
+    ]
+
+async def serial_baseline(listener, messages):
+    buffers = [await listener.download_media(m) for m in messages]
+    media_ids = [await listener.twitter.uploader.upload_file(b) for b in buffers]
+    for buffer in buffers: buffer.close()
+    return media_ids
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        listener = build_listener(args, tmp)
+        messages = make_album(args.items)
+
+        start = time.perf_counter()
+        await serial_baseline(listener, messages)
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await listener.execute_album_post(messages)
+        pipelined = time.perf_counter() - start
+        listener.storage.close()
+
+    print(f"items={args.items} download={args.download}s upload={args.upload}s "
+          f"download_slots={Config.DOWNLOAD_CONCURRENCY} upload_slots={Config.UPLOAD_CONCURRENCY}")
+    print(f"serial (before):    {serial:.2f}s")
+    print(f"pipelined (after):  {pipelined:.2f}s")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--download", type=float, default=0.4)
+    parser.add_argument("--upload", type=float, default=0.6)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
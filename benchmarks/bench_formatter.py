@@ -0,0 +1,62 @@
+"""
+Tweet splitter microbenchmark on ~50 KB inputs.
+
+Compares TextFormatter.split_into_threads with the previous len()-based
+splitter and checks that every part fits Twitter's weighted limit.
+
+    python -m benchmarks.bench_formatter
+"""
+import random
+import time
+
+from utils.formatter import MAX_TWEET_WEIGHT, TextFormatter
+
+def legacy_split(text, limit=270):
+    if not text: return []
+    if len(text) <= limit: return [text]
+
+    threads = []
+    while len(text) > limit:
+        split_index = text.rfind(' ', 0, limit)
+        if split_index == -1: split_index = limit
+        threads.append(text[:split_index])
+        text = text[split_index:].strip()
+
+    if text: threads.append(text)
+    return [f"{t} ({i+1}/{len(threads)})" for i, t in enumerate(threads)]
+
+def make_text(kind, size=50_000):
+    rng = random.Random(kind)
+    words = {
+        "latin": ["lorem", "ipsum", "dolor", "sit", "amet.", "consectetur", "#news", "@channel"],
+        "cjk": ["日本語", "テキスト", "中文字符", "한국어", "。"],
+        "mixed": ["word", "😀", "👩‍💻", "https://example.com/some/long/path?x=1", "ünïcode", "\n\n", "end."],
+    }[kind]
+    parts, length = [], 0
+    while length < size:
+        w = rng.choice(words)
+        parts.append(w)
+        length += len(w) + 1
+    return " ".join(parts)
+
+def bench(func, text, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    print(f"{'input':>8} {'legacy (ms)':>12} {'weighted (ms)':>14} {'parts':>6} {'over limit':>11}")
+    for kind in ("latin", "cjk", "mixed"):
+        text = make_text(kind)
+        legacy_time, legacy_parts = bench(legacy_split, text)
+        new_time, parts = bench(TextFormatter.split_into_threads, text)
+        legacy_over = sum(TextFormatter.weighted_length(p) > MAX_TWEET_WEIGHT for p in legacy_parts)
+        over = sum(TextFormatter.weighted_length(p) > MAX_TWEET_WEIGHT for p in parts)
+        print(f"{kind:>8} {legacy_time * 1000:>12.1f} {new_time * 1000:>14.1f} {len(parts):>6} "
+              f"{over:>4} (legacy {legacy_over})")
+
+if __name__ == "__main__":
+    main()
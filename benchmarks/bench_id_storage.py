@@ -0,0 +1,54 @@
+"""
+IDStorage latency benchmark.
+
+Fills a fresh database up to 1M mappings and measures add/lookup latency at
+several sizes. Latency should stay flat as the table grows.
+
+    python -m benchmarks.bench_id_storage [--total 1000000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from utils.id_storage import IDStorage
+
+def measure(storage, next_id, samples=2000):
+    start = time.perf_counter()
+    for i in range(samples):
+        storage.add_id(next_id + i, 10**18 + next_id + i)
+    add_us = (time.perf_counter() - start) / samples * 1e6
+
+    keys = [random.randrange(1, next_id) for _ in range(samples)]
+    start = time.perf_counter()
+    for key in keys:
+        storage.get_tweet_id(key)
+    lookup_us = (time.perf_counter() - start) / samples * 1e6
+    return add_us, lookup_us, next_id + samples
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--total", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    checkpoints = [c for c in (10_000, 100_000, 500_000, 1_000_000) if c <= args.total] or [args.total]
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = IDStorage(os.path.join(tmp, "bench.db"))
+        next_id = 1
+        print(f"{'mappings':>10} {'add (us)':>10} {'lookup (us)':>12}")
+        for checkpoint in checkpoints:
+            batch = []
+            while next_id < checkpoint:
+                batch.append((next_id, 10**18 + next_id))
+                next_id += 1
+                if len(batch) >= 50_000:
+                    storage.add_ids(batch)
+                    batch = []
+            if batch: storage.add_ids(batch)
+            add_us, lookup_us, next_id = measure(storage, next_id)
+            print(f"{storage.count():>10} {add_us:>10.1f} {lookup_us:>12.1f}")
+        storage.close()
+
+if __name__ == "__main__":
+    main()
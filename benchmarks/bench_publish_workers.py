@@ -0,0 +1,115 @@
+"""
+Publisher process scaling benchmark.
+
+Runs the same workload (one image upload + one tweet thread per post) against the
+fake Twitter server in-process (0) and with 1..N publisher processes fed through
+the PublishQueue, and reports posts/s and speed-up for each.
+
+    python -m benchmarks.bench_publish_workers --posts 300 --processes 0,1,2,4
+
+Scaling is bounded by the CPU cores available (see `nproc`).
+"""
+import argparse
+import asyncio
+import functools
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import types
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=300)
+    parser.add_argument("--processes", default="0,1,2,4", help="publisher process counts to compare (0 = in-process)")
+    parser.add_argument("--concurrency", type=int, default=32, help="posts in flight at once")
+    parser.add_argument("--words", type=int, default=80, help="words per post (long posts become threads)")
+    parser.add_argument("--media-kb", type=float, default=200)
+    parser.add_argument("--tw-latency", type=float, default=0.02)
+    return parser.parse_args()
+
+def fake_server(ports, latency):
+    from benchmarks.loadtest.fake_twitter import FakeTwitter
+    ports.put(FakeTwitter(latency=latency).start())
+    while True:
+        time.sleep(3600)
+
+async def workload(publisher, args, data):
+    from utils.media_buffer import MediaBuffer
+    slots = asyncio.Semaphore(args.concurrency)
+    text = " ".join(["lorem ipsum dolor sit amet"] * (args.words // 5))
+
+    async def post(n):
+        async with slots:
+            buffer = MediaBuffer(f"photo{n}.jpg", io.BytesIO(data))
+            try:
+                media_id = await publisher.uploader.upload_file(buffer)
+            finally:
+                buffer.close()
+            return await publisher.post_tweet(f"{n} {text}", media_ids=[media_id] if media_id else None)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(post(n) for n in range(args.posts)))
+    return time.perf_counter() - started, sum(1 for r in results if r)
+
+async def run(processes, args, port, data):
+    from core.env_loader import Config
+    from benchmarks.loadtest.fake_twitter import route_publishers
+    from twitter.publisher import TwitterPublisher
+    from twitter.remote import PublisherPool, RemotePublisher
+    from utils.publish_queue import PublishQueue
+
+    Config.ensure_dirs()
+    if processes == 0:
+        publisher = TwitterPublisher(Config)
+        route_publishers(port, {"default": publisher})
+        return await workload(publisher, args, data)
+
+    queue = PublishQueue(Config.PUBLISH_QUEUE_FILE)
+    queue.reset()
+    pool = PublisherPool(processes, Config.PUBLISH_QUEUE_FILE, setup=functools.partial(route_publishers, port))
+    pool.start()
+    try:
+        while len(queue.worker_status("default")) < processes:
+            await asyncio.sleep(0.1)
+        return await workload(RemotePublisher(queue, "default", Config.TEMP_DIR), args, data)
+    finally:
+        pool.stop()
+
+def main():
+    args = parse_args()
+    sys.path.insert(0, REPO)
+    from benchmarks.loadtest.run import configure_env
+    configure_env(types.SimpleNamespace(channel_id=-1001, tw_rate_limit=10**6, publish_workers=0))
+
+    context = multiprocessing.get_context("spawn")
+    ports = context.Queue()
+    server = context.Process(target=fake_server, args=(ports, args.tw_latency), daemon=True)
+    server.start()
+    port = ports.get(timeout=30)
+    data = os.urandom(int(args.media_kb * 1024))
+
+    results = {}
+    try:
+        for processes in (int(p) for p in args.processes.split(",")):
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                elapsed, posted = asyncio.run(run(processes, args, port, data))
+                os.chdir(REPO)
+            results[processes] = args.posts / elapsed
+            print(f"processes={processes}: {posted}/{args.posts} posts in {elapsed:.2f}s ({results[processes]:.1f} posts/s)")
+    finally:
+        server.terminate()
+
+    base = results.get(0) or next(iter(results.values()))
+    print(f"\ncpu cores: {os.cpu_count()}")
+    for processes, rate in results.items():
+        label = "in-process" if processes == 0 else f"{processes} publisher process(es)"
+        print(f"{label:>26}: {rate:7.1f} posts/s  x{rate / base:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Cold-start benchmark: time from interpreter launch to the first channel event handled.
+
+Every run starts a fresh interpreter with the Telegram login stubbed to take
+--login-latency seconds, then reports each phase: interpreter start, imports,
+Config.load(), listener init, login and publisher setup (run concurrently),
+and the first NewMessage event going through a mirror.
+
+    python -m benchmarks.bench_startup --runs 5 --login-latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ("interpreter", "imports", "config", "listener_init", "login", "publishing", "ready", "first_event", "total")
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--login-latency", type=float, default=0.5, help="seconds the stubbed Telegram login takes")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def child(args):
+    stamps = {"launched": float(os.environ["BENCH_LAUNCHED"]), "started": time.time()}
+    import main  # noqa: F401  (the bot's own import graph)
+    from core.env_loader import Config
+    from telegram.listener import TelegramListener
+    stamps["imported"] = time.time()
+    Config.load()
+    stamps["configured"] = time.time()
+    bot = TelegramListener()
+    stamps["initialized"] = time.time()
+
+    handlers = []
+
+    async def start(bot_token=None):
+        await asyncio.sleep(args.login_latency)
+
+    async def run_until_disconnected():
+        message = types.SimpleNamespace(
+            id=1, grouped_id=None, reply_to_msg_id=None, is_reply=False,
+            media=None, raw_text="hello", action=None, date=None
+        )
+        await handlers[0](types.SimpleNamespace(chat_id=Config.TG_CHANNEL_ID, message=message))
+        stamps["first_event"] = time.time()
+
+    bot.client.start = start
+    bot.client.add_event_handler = lambda callback, event=None: handlers.append(callback)
+    bot.client.run_until_disconnected = run_until_disconnected
+    asyncio.run(bot.start())
+    print(json.dumps({"stamps": stamps, "startup": bot.startup}))
+
+def phases(result):
+    s, startup = result["stamps"], result["startup"]
+    return {
+        "interpreter": s["started"] - s["launched"],
+        "imports": s["imported"] - s["started"],
+        "config": s["configured"] - s["imported"],
+        "listener_init": s["initialized"] - s["configured"],
+        "login": startup["login"],
+        "publishing": startup["publishing"],
+        "ready": startup["ready"],
+        "first_event": s["first_event"] - s["initialized"] - startup["ready"],
+        "total": s["first_event"] - s["launched"],
+    }
+
+def main():
+    args = parse_args()
+    if args.child:
+        sys.path.insert(0, REPO)
+        from benchmarks.loadtest.run import configure_env
+        configure_env(types.SimpleNamespace(channel_id=-1001, tw_rate_limit=100, publish_workers=0))
+        child(args)
+        return
+
+    runs = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, BENCH_LAUNCHED=repr(time.time()), PYTHONPATH=REPO)
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_startup", "--child", "--login-latency", str(args.login_latency)],
+                cwd=tmp, env=env, capture_output=True, text=True, check=True
+            ).stdout
+            runs.append(phases(json.loads(out.strip().splitlines()[-1])))
+
+    print(f"{args.runs} cold starts, stubbed login {args.login_latency:.2f}s (median / max):")
+    for phase in PHASES:
+        values = [run[phase] for run in runs]
+        print(f"  {phase:>14}: {statistics.median(values) * 1000:7.0f} ms / {max(values) * 1000:7.0f} ms")
+    sequential = statistics.median(run["login"] + run["publishing"] for run in runs)
+    print(f"\nlogin + publisher setup one after the other would take {sequential * 1000:.0f} ms; "
+          f"overlapped: {statistics.median(run['ready'] for run in runs) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
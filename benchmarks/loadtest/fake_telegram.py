@@ -0,0 +1,163 @@
+"""
+Synthetic Telegram side of the load test.
+
+FakeTelegramClient serves downloads and get_messages from memory. EventSource
+builds real Telethon Message objects (photos, videos, albums, replies) and
+feeds NewMessage / MessageEdited / MessageDeleted events into the listener.
+"""
+import asyncio
+import datetime
+import itertools
+import random
+import time
+import types
+from telethon.tl import types as tl
+from telethon.tl.custom.message import Message
+
+from .fake_twitter import MARKER_RE
+
+class FakeTelegramClient:
+    def __init__(self, latency=0.05, bandwidth=50 * 2**20):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.messages = {}
+
+    async def download_media(self, message, file=None):
+        size = message.file.size if message.file else 0
+        await asyncio.sleep(self.latency + size / self.bandwidth)
+        chunk = b"\0" * 65536
+        remaining = size
+        while remaining > 0:
+            file.write(chunk[:min(remaining, len(chunk))])
+            remaining -= len(chunk)
+        return file
+
+    async def get_messages(self, chat, ids=None, **kwargs):
+        if isinstance(ids, list):
+            return [self.messages.get(i) for i in ids]
+        return self.messages.get(ids)
+
+class EventSource:
+    def __init__(self, listener, client, args):
+        self.listener = listener
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.ids = itertools.count(1)
+        self.media_ids = itertools.count(1)
+        self.channel = tl.PeerChannel(abs(args.channel_id))
+        self.injected = {}
+        self.posts = []
+        self.followups = []
+        self.edits = 0
+        self.deletions = 0
+
+    def _media(self, video):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        media_id = next(self.media_ids)
+        if video:
+            size = int(self.args.video_kb * 1024)
+            document = tl.Document(
+                id=media_id, access_hash=media_id, file_reference=b"", date=now, mime_type="video/mp4",
+                size=size, dc_id=2, attributes=[
+                    tl.DocumentAttributeVideo(duration=10, w=1280, h=720),
+                    tl.DocumentAttributeFilename(f"clip{media_id}.mp4"),
+                ]
+            )
+            return tl.MessageMediaDocument(document=document)
+        size = int(self.args.media_kb * 1024)
+        photo = tl.Photo(
+            id=media_id, access_hash=media_id, file_reference=b"", date=now,
+            sizes=[tl.PhotoSize(type="y", w=1280, h=1280, size=size)], dc_id=2
+        )
+        return tl.MessageMediaPhoto(photo=photo)
+
+    def _message(self, msg_id, text, media=None, grouped_id=None, reply_to=None):
+        message = Message(
+            id=msg_id, peer_id=self.channel, date=datetime.datetime.now(datetime.timezone.utc),
+            message=text, media=media, grouped_id=grouped_id,
+            reply_to=tl.MessageReplyHeader(reply_to_msg_id=reply_to) if reply_to else None
+        )
+        self.client.messages[msg_id] = message
+        return message
+
+    def _text(self, first_id, version):
+        words = " ".join(self.rng.choice(("lorem", "ipsum", "dolor", "sit", "amet")) for _ in range(self.args.words))
+        return f"[lt:{first_id}:{version}] {words}"
+
+    def _build_post(self):
+        args, rng = self.args, self.rng
+        is_album = rng.random() < args.album_ratio
+        count = rng.randint(args.album_min, args.album_max) if is_album else 1
+        ids = [next(self.ids) for _ in range(count)]
+        grouped_id = ids[0] * 1000 if is_album else None
+        reply_to = None
+        if self.posts and rng.random() < args.reply_ratio:
+            reply_to = rng.choice(self.posts)[0]
+
+        messages = []
+        for index, msg_id in enumerate(ids):
+            has_media = is_album or rng.random() < args.media_ratio
+            media = self._media(rng.random() < args.video_ratio) if has_media else None
+            text = self._text(ids[0], 0) if index == 0 else ""
+            messages.append(self._message(msg_id, text, media, grouped_id, reply_to if index == 0 else None))
+        return messages
+
+    async def run(self):
+        """Injects args.posts posts at args.rate posts/s, plus edits and deletions of earlier posts."""
+        interval = 1.0 / self.args.rate
+        started = time.monotonic()
+        for n in range(self.args.posts):
+            await asyncio.sleep(max(0.0, started + n * interval - time.monotonic()))
+            messages = self._build_post()
+            ids = [m.id for m in messages]
+            self.posts.append(ids)
+            self.injected[(ids[0], 0)] = time.monotonic()
+            for message in messages:
+                await self.listener.handle_new_message(types.SimpleNamespace(message=message))
+
+            roll = self.rng.random()
+            if roll < self.args.edit_ratio:
+                self.followups.append(asyncio.create_task(self._edit_later(ids)))
+            elif roll < self.args.edit_ratio + self.args.delete_ratio:
+                self.followups.append(asyncio.create_task(self._delete_later(ids)))
+        await asyncio.gather(*self.followups)
+
+    async def _wait_posted(self, first_id, version, fake_twitter, timeout=120):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.listener.storage.is_posted(first_id) and (first_id, version) in posted_markers(fake_twitter):
+                return True
+            await asyncio.sleep(0.2)
+        return False
+
+    async def _edit_later(self, ids):
+        if not await self._wait_posted(ids[0], 0, self.args.fake_twitter): return
+        await asyncio.sleep(self.rng.uniform(0, 1))
+        old = self.client.messages[ids[0]]
+        edited = self._message(
+            ids[0], self._text(ids[0], 1), old.media, old.grouped_id,
+            old.reply_to_msg_id if old.is_reply else None
+        )
+        self.injected[(ids[0], 1)] = time.monotonic()
+        self.edits += 1
+        await self.listener.handle_message_edit(types.SimpleNamespace(message=edited))
+
+    async def _delete_later(self, ids):
+        if not await self._wait_posted(ids[0], 0, self.args.fake_twitter): return
+        await asyncio.sleep(self.rng.uniform(0, 1))
+        for msg_id in ids:
+            self.client.messages.pop(msg_id, None)
+        self.deletions += 1
+        await self.listener.handle_deletion(types.SimpleNamespace(deleted_ids=ids))
+
+def posted_markers(fake_twitter):
+    """{(first message id, version): creation time} for every tweet seen by the fake server."""
+    with fake_twitter.lock:
+        created = list(fake_twitter.created)
+    markers = {}
+    for stamp, _, text in created:
+        match = MARKER_RE.match(text)
+        if match:
+            markers.setdefault((int(match.group(1)), int(match.group(2))), stamp)
+    return markers
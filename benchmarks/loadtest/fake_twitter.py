@@ -0,0 +1,199 @@
+"""
+Local stand-in for the Twitter endpoints the publisher uses:
+v2 POST/DELETE /2/tweets and v1.1 media/upload (simple + chunked INIT/APPEND/FINALIZE/STATUS).
+
+Latency, 429s and 5xx failures are injectable. HostRewriteAdapter, mounted on the
+tweepy sessions, sends api.twitter.com / upload.twitter.com traffic here.
+"""
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+from requests.adapters import HTTPAdapter
+
+MARKER_RE = re.compile(r"\[lt:(\d+):(\d+)\]")
+COMMAND_RE = re.compile(rb'name="command"\r\n\r\n(\w+)')
+MEDIA_ID_RE = re.compile(rb'name="media_id"\r\n\r\n(\d+)')
+
+class FakeTwitter:
+    def __init__(self, latency=0.05, rate_429=0.0, failure_rate=0.0, rate_limit=100_000, seed=0):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.failure_rate = failure_rate
+        self.rate_limit = rate_limit
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.ids = itertools.count(10**18)
+        self.window_start = time.time()
+        self.used = {}
+        self.tweets = {}
+        self.created = []
+        self.deleted = 0
+        self.uploads = 0
+        self.upload_bytes = 0
+        self.injected_429 = 0
+        self.injected_failures = 0
+        self.server = None
+
+    def start(self, host="127.0.0.1"):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                fake.handle(self, "POST")
+
+            def do_DELETE(self):
+                fake.handle(self, "DELETE")
+
+            def do_GET(self):
+                fake.handle(self, "GET")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="fake-twitter", daemon=True).start()
+        return self.server.server_address[1]
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def _rate_headers(self, endpoint):
+        now = time.time()
+        with self.lock:
+            if now - self.window_start >= 900:
+                self.window_start, self.used = now, {}
+            self.used[endpoint] = self.used.get(endpoint, 0) + 1
+            remaining = max(0, self.rate_limit - self.used[endpoint])
+        reset = int(self.window_start + 900)
+        return {
+            "x-rate-limit-limit": str(self.rate_limit),
+            "x-rate-limit-remaining": str(remaining),
+            "x-rate-limit-reset": str(reset),
+        }
+
+    def _inject(self):
+        """None, 429 or 503 for this request."""
+        with self.lock:
+            roll = self.rng.random()
+            if roll < self.rate_429:
+                self.injected_429 += 1
+                return 429
+            if roll < self.rate_429 + self.failure_rate:
+                self.injected_failures += 1
+                return 503
+        return None
+
+    def handle(self, request, method):
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+        path = urlsplit(request.path).path
+        query = parse_qs(urlsplit(request.path).query)
+        if self.latency:
+            time.sleep(self.latency)
+
+        endpoint = "media" if path.startswith("/1.1/media") else f"tweets_{method}"
+        injected = self._inject()
+        if injected == 429:
+            headers = self._rate_headers(endpoint)
+            headers["x-rate-limit-remaining"] = "0"
+            headers["x-rate-limit-reset"] = str(int(time.time()) + 1)
+            return self._reply(request, 429, {"errors": [{"code": 88, "message": "Rate limit exceeded"}]}, headers)
+        if injected == 503:
+            return self._reply(request, 503, {"errors": [{"code": 131, "message": "Injected failure"}]})
+
+        headers = self._rate_headers(endpoint)
+        if path == "/2/tweets" and method == "POST":
+            payload = json.loads(body or b"{}")
+            tweet_id = str(next(self.ids))
+            with self.lock:
+                self.tweets[tweet_id] = payload.get("text", "")
+                self.created.append((time.monotonic(), tweet_id, payload.get("text", "")))
+            return self._reply(request, 201, {"data": {"id": tweet_id, "text": payload.get("text", "")}}, headers)
+
+        if path.startswith("/2/tweets/") and method == "DELETE":
+            with self.lock:
+                self.tweets.pop(path.rsplit("/", 1)[-1], None)
+                self.deleted += 1
+            return self._reply(request, 200, {"data": {"deleted": True}}, headers)
+
+        if path == "/1.1/media/upload.json":
+            return self._media(request, method, body, query, headers)
+
+        return self._reply(request, 404, {"errors": [{"code": 34, "message": "Not found"}]})
+
+    def _media(self, request, method, body, query, headers):
+        if method == "GET":
+            media_id = int(query["media_id"][0])
+            return self._reply(request, 200, {
+                "media_id": media_id, "media_id_string": str(media_id),
+                "processing_info": {"state": "succeeded", "progress_percent": 100},
+            }, headers)
+
+        match = COMMAND_RE.search(body)
+        form = parse_qs(body.decode("latin-1")) if not match else {}
+        command = match.group(1).decode() if match else (form.get("command") or [None])[0]
+
+        if command == "APPEND":
+            with self.lock:
+                self.upload_bytes += len(body)
+            return self._reply(request, 204, None, headers)
+        if command == "FINALIZE":
+            media_id = int(form["media_id"][0])
+            with self.lock:
+                self.uploads += 1
+            return self._reply(request, 200, {
+                "media_id": media_id, "media_id_string": str(media_id),
+                "processing_info": {"state": "pending", "check_after_secs": 0},
+            }, headers)
+
+        media_id = next(self.ids)
+        if command != "INIT":
+            with self.lock:
+                self.uploads += 1
+                self.upload_bytes += len(body)
+        return self._reply(request, 200, {
+            "media_id": media_id, "media_id_string": str(media_id), "expires_after_secs": 86400,
+        }, headers)
+
+    @staticmethod
+    def _reply(request, status, payload, headers=None):
+        data = json.dumps(payload).encode() if payload is not None else b""
+        request.send_response(status)
+        for key, value in (headers or {}).items():
+            request.send_header(key, value)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+class HostRewriteAdapter(HTTPAdapter):
+    """Sends every https:// request of a session to the fake server over plain HTTP."""
+    def __init__(self, port, host="127.0.0.1", **kwargs):
+        super().__init__(**kwargs)
+        self.netloc = f"{host}:{port}"
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = urlunsplit(("http", self.netloc, parts.path, parts.query, parts.fragment))
+        return super().send(request, **kwargs)
+
+def route_publisher(publisher, port):
+    """Points a TwitterPublisher's tweepy sessions at the fake server."""
+    adapter = HostRewriteAdapter(port)
+    publisher.client.session.mount("https://", adapter)
+    publisher.api_v1.session.mount("https://", adapter)
+
+def route_publishers(port, publishers):
+    """route_publisher for every publisher of a {name: publisher} map (PublisherPool setup hook)."""
+    for publisher in publishers.values():
+        route_publisher(publisher, port)
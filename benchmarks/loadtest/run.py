@@ -0,0 +1,151 @@
+"""
+End-to-end load test: the real TelegramListener + TwitterPublisher pipeline
+(job queue, scheduler, downloads, uploads, threading) against local fakes.
+
+Reports posts/minute, event-to-tweet latency percentiles, injected errors
+and peak memory. Runs in a temporary working directory.
+
+    python -m benchmarks.loadtest.run --posts 200 --rate 5 --album-ratio 0.3 \
+        --tw-latency 0.05 --tw-429 0.02 --tw-fail 0.01
+"""
+import argparse
+import asyncio
+import functools
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=100, help="posts to inject")
+    parser.add_argument("--rate", type=float, default=2.0, help="posts per second")
+    parser.add_argument("--album-ratio", type=float, default=0.3)
+    parser.add_argument("--album-min", type=int, default=2)
+    parser.add_argument("--album-max", type=int, default=10)
+    parser.add_argument("--media-ratio", type=float, default=0.7, help="single posts carrying media")
+    parser.add_argument("--video-ratio", type=float, default=0.1)
+    parser.add_argument("--media-kb", type=float, default=300)
+    parser.add_argument("--video-kb", type=float, default=8 * 1024)
+    parser.add_argument("--reply-ratio", type=float, default=0.1)
+    parser.add_argument("--edit-ratio", type=float, default=0.1)
+    parser.add_argument("--delete-ratio", type=float, default=0.05)
+    parser.add_argument("--words", type=int, default=30, help="words per caption (long captions become threads)")
+    parser.add_argument("--tg-latency", type=float, default=0.05, help="download latency (s)")
+    parser.add_argument("--tg-bandwidth", type=float, default=50, help="download bandwidth (MB/s)")
+    parser.add_argument("--tw-latency", type=float, default=0.05, help="Twitter response latency (s)")
+    parser.add_argument("--tw-429", type=float, default=0.0, help="share of Twitter calls answered with 429")
+    parser.add_argument("--tw-fail", type=float, default=0.0, help="share of Twitter calls answered with 503")
+    parser.add_argument("--tw-rate-limit", type=int, default=100_000, help="per-window limit advertised in headers")
+    parser.add_argument("--timeout", type=float, default=300, help="max seconds to wait for the backlog to drain")
+    parser.add_argument("--tracemalloc", action="store_true", help="also report the traced Python heap peak")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--channel-id", type=int, default=-1001)
+    parser.add_argument("--publish-workers", type=int, default=0, help="publisher processes (0 = in-process)")
+    return parser.parse_args()
+
+def configure_env(args):
+    for key, value in {
+        "TELEGRAM_API_ID": "1", "TELEGRAM_API_HASH": "0" * 32, "TELEGRAM_BOT_TOKEN": "0:fake",
+        "TELEGRAM_CHANNEL_ID": str(args.channel_id), "ADMIN_USER_ID": "1",
+        "TWITTER_API_KEY": "k", "TWITTER_API_SECRET": "s", "TWITTER_ACCESS_TOKEN": "t",
+        "TWITTER_ACCESS_SECRET": "a", "TWITTER_BEARER_TOKEN": "b",
+        "TWITTER_THREAD_DELAY": "0", "FAST_DOWNLOAD_WORKERS": "1", "BACKFILL_LIMIT": "0",
+        "TWITTER_RATE_TWEET_CREATE": str(args.tw_rate_limit),
+        "TWITTER_RATE_TWEET_DELETE": str(args.tw_rate_limit),
+        "TWITTER_RATE_MEDIA_UPLOAD": str(args.tw_rate_limit),
+        "TWITTER_DAILY_TWEET_CAP": str(args.tw_rate_limit),
+        "JOB_RETRY_BASE": "1",
+        "PUBLISH_WORKERS": str(args.publish_workers),
+    }.items():
+        os.environ.setdefault(key, value)
+    os.environ.pop("TELEGRAM_LOG_CHANNEL_ID", None)
+
+def percentile(values, p):
+    if not values: return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+async def run(args):
+    from core.env_loader import Config
+    from telegram.listener import TelegramListener
+    from .fake_telegram import EventSource, FakeTelegramClient, posted_markers
+    from .fake_twitter import FakeTwitter, route_publisher, route_publishers
+
+    fake_twitter = FakeTwitter(args.tw_latency, args.tw_429, args.tw_fail, args.tw_rate_limit, seed=args.seed)
+    port = fake_twitter.start()
+    args.fake_twitter = fake_twitter
+
+    bot = TelegramListener()
+    client = FakeTelegramClient(args.tg_latency, args.tg_bandwidth * 2**20)
+    bot.client = client
+    bot.setup_publishing(functools.partial(route_publishers, port))
+    listener = bot.mirrors[0]
+    if not bot.publisher_pool:
+        route_publisher(listener.twitter, port)
+
+    listener.jobs.recover()
+    workers = [asyncio.create_task(listener.job_worker()) for _ in range(Config.JOB_WORKERS)]
+    source = EventSource(listener, client, args)
+
+    started = time.monotonic()
+    await source.run()
+    injected_done = time.monotonic()
+
+    expected = set(source.injected)
+    deadline = time.monotonic() + args.timeout
+    while time.monotonic() < deadline:
+        if expected <= set(posted_markers(fake_twitter)) and listener.jobs.stats().get("pending", 0) == 0:
+            break
+        await asyncio.sleep(0.5)
+    finished = time.monotonic()
+
+    for worker in workers: worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    fake_twitter.stop()
+    if bot.publisher_pool:
+        bot.publisher_pool.stop()
+
+    markers = posted_markers(fake_twitter)
+    latencies = {0: [], 1: []}
+    for key, injected_at in source.injected.items():
+        if key in markers:
+            latencies[key[1]].append(markers[key] - injected_at)
+    done = sum(len(v) for v in latencies.values())
+    elapsed = (max(markers.values()) if markers else finished) - started
+
+    print(f"\nposts injected: {args.posts} over {injected_done - started:.1f}s "
+          f"(edits {source.edits}, deletions {source.deletions})")
+    print(f"posts on Twitter: {len(latencies[0])}/{args.posts}, edits synced: {len(latencies[1])}/{source.edits}, "
+          f"tweets deleted: {fake_twitter.deleted}")
+    print(f"throughput: {done / elapsed * 60 if elapsed > 0 else 0:.1f} posts/min over {elapsed:.1f}s")
+    for version, label in ((0, "post"), (1, "edit")):
+        values = latencies[version]
+        if values:
+            print(f"{label} latency: p50 {percentile(values, 50):.2f}s  p95 {percentile(values, 95):.2f}s  "
+                  f"p99 {percentile(values, 99):.2f}s  max {max(values):.2f}s")
+    print(f"twitter: {len(fake_twitter.created)} tweets created, {fake_twitter.uploads} media uploads "
+          f"({fake_twitter.upload_bytes / 2**20:.1f} MB), injected 429s {fake_twitter.injected_429}, "
+          f"injected failures {fake_twitter.injected_failures}")
+    print(f"jobs: {listener.jobs.stats()}")
+    print(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+    if args.tracemalloc:
+        print(f"peak traced heap: {tracemalloc.get_traced_memory()[1] / 2**20:.1f} MB")
+
+def main():
+    args = parse_args()
+    configure_env(args)
+    sys.path.insert(0, REPO)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        if args.tracemalloc:
+            tracemalloc.start()
+        asyncio.run(run(args))
+        os.chdir(REPO)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Memory soak test for the listener's in-memory state.
+
+Replays synthetic channel events (posts, album items, edits, deletions)
+through the ChannelMirror handlers with the debounce windows set to zero,
+and samples tracemalloc / RSS along the way. Fails if traced memory or RSS
+keeps growing after warm-up.
+
+    python -m benchmarks.soak_memory [--events 1000000 --max-growth-mb 8]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import types
+
+for key, value in {
+    "TELEGRAM_API_ID": "1", "TELEGRAM_CHANNEL_ID": "-1001", "ADMIN_USER_ID": "1",
+    "ALBUM_QUIET": "0", "EDIT_QUIET": "0",
+}.items():
+    os.environ.setdefault(key, value)
+
+from core.env_loader import Config
+from telegram.mirror import ChannelMirror
+from utils.id_storage import IDStorage
+from utils.message_index import MessageIndex
+
+class SoakJobs:
+    """Completes jobs on enqueue: posts land in storage, deletions leave it."""
+    def __init__(self, listener):
+        self.listener = listener
+        self.ids = itertools.count(1)
+        self.enqueued = 0
+
+    def enqueue(self, kind, payload, key, delay=0, dedupe_states=None):
+        self.enqueued += 1
+        if kind == "post":
+            ids = payload["message_ids"]
+            self.listener.storage.add_ids((mid, str(ids[0])) for mid in ids)
+        elif kind == "delete":
+            for mid in payload["message_ids"]:
+                self.listener.storage.delete_id(mid)
+        return next(self.ids)
+
+    def active_payloads(self, kind):
+        return []
+
+    def drop_messages(self, kind, msg_ids):
+        return []
+
+class SoakListener(ChannelMirror):
+    def enqueue_post(self, messages, delay=0):
+        self.jobs.enqueue("post", {"message_ids": [m.id for m in messages]}, f"post:{messages[0].id}")
+
+def build_listener(tmp):
+    Config.ensure_dirs()
+    listener = SoakListener.__new__(SoakListener)
+    listener.storage = IDStorage(os.path.join(tmp, "soak.db"))
+    listener.recent = MessageIndex(Config.MESSAGE_INDEX_SIZE)
+    listener.album_queue, listener.edit_tasks = ChannelMirror.debounce_maps()
+    listener.job_messages = {}
+    listener.job_ready = asyncio.Event()
+    listener.bot = types.SimpleNamespace(is_paused=False)
+    listener.jobs = SoakJobs(listener)
+    return listener
+
+def message(msg_id, grouped_id=None):
+    return types.SimpleNamespace(
+        id=msg_id, grouped_id=grouped_id, reply_to_msg_id=None, is_reply=False,
+        media=None, raw_text=f"post {msg_id}", action=None, date=None
+    )
+
+async def replay(listener, events, samples):
+    rng = random.Random(0)
+    next_id, next_group, done = 1, 1, 0
+    step = max(events // samples, 1)
+    marks = []
+    while done < events:
+        roll = rng.random()
+        if roll < 0.6:
+            await listener.handle_new_message(types.SimpleNamespace(message=message(next_id)))
+            next_id, done = next_id + 1, done + 1
+        elif roll < 0.85:
+            size = rng.randint(2, 10)
+            for _ in range(size):
+                await listener.handle_new_message(types.SimpleNamespace(message=message(next_id, next_group)))
+                next_id += 1
+            next_group, done = next_group + 1, done + size
+        elif roll < 0.95:
+            target = max(1, next_id - rng.randint(1, 5000))
+            await listener.handle_message_edit(types.SimpleNamespace(message=message(target)))
+            done += 1
+        else:
+            target = max(1, next_id - rng.randint(1, 5000))
+            await listener.handle_deletion(types.SimpleNamespace(deleted_ids=[target]))
+            done += 1
+
+        if done // step > len(marks):
+            for _ in range(3): await asyncio.sleep(0)
+            marks.append((done, tracemalloc.get_traced_memory()[0], rss_bytes()))
+    return marks
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        listener = build_listener(tmp)
+        tracemalloc.start()
+        started = time.perf_counter()
+        marks = await replay(listener, args.events, args.samples)
+        elapsed = time.perf_counter() - started
+        tracemalloc.stop()
+        listener.storage.close()
+
+    print(f"{'events':>10} {'traced (MB)':>12} {'rss (MB)':>10}")
+    for done, traced, rss in marks:
+        print(f"{done:>10} {traced / 2**20:>12.2f} {rss / 2**20:>10.1f}")
+    print(f"{args.events} events in {elapsed:.1f}s; jobs enqueued: {listener.jobs.enqueued}")
+    print(f"album_queue={len(listener.album_queue)} edit_tasks={len(listener.edit_tasks)} "
+          f"job_messages={len(listener.job_messages)} index={len(listener.recent.entries)}")
+
+    warm = marks[len(marks) // 5]
+    growth = (marks[-1][1] - warm[1]) / 2**20
+    rss_growth = (marks[-1][2] - warm[2]) / 2**20
+    print(f"growth after warm-up: traced {growth:+.2f} MB, rss {rss_growth:+.1f} MB "
+          f"(limit {args.max_growth_mb} MB)")
+    if max(growth, rss_growth) > args.max_growth_mb:
+        raise SystemExit("FAIL: memory keeps growing")
+    print("OK")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--max-growth-mb", type=float, default=8)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,102 @@
 import os
-from dotenv import load_dotenv
+from types import SimpleNamespace
 from .exceptions import ConfigurationError
 
+def _flag(name, default="false"):
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
 
-load_dotenv()
+class _LazyConfig(type):
+    """Scripts and benchmarks that never call Config.load() get it on first use of a setting."""
+    def __getattr__(cls, name):
+        if name.startswith("_") or cls._loaded:
+            raise AttributeError(name)
+        cls.load()
+        return getattr(cls, name)
 
-class Config:
+class Config(metaclass=_LazyConfig):
     """
     Tüm ortam değişkenlerini yöneten merkezi sınıf.
+    Import sırasında hiçbir şey okunmaz; ayarlar Config.load() ile yüklenir.
     """
-    try:
-        
-        TG_API_ID = int(os.getenv("TELEGRAM_API_ID"))
-        TG_API_HASH = os.getenv("TELEGRAM_API_HASH")
-        TG_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-        TG_CHANNEL_ID = int(os.getenv("TELEGRAM_CHANNEL_ID"))
-        LOG_CHANNEL_ID = int(os.getenv("TELEGRAM_LOG_CHANNEL_ID")) if os.getenv("TELEGRAM_LOG_CHANNEL_ID") else None
-        ADMIN_ID = int(os.getenv("ADMIN_USER_ID"))
-        
-        TW_API_KEY = os.getenv("TWITTER_API_KEY")
-        TW_API_SECRET = os.getenv("TWITTER_API_SECRET")
-        TW_ACCESS_TOKEN = os.getenv("TWITTER_ACCESS_TOKEN")
-        TW_ACCESS_SECRET = os.getenv("TWITTER_ACCESS_SECRET")
-        TW_BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
+    _loaded = False
 
-    except (TypeError, ValueError) as e:
-        
-        print(f"Environment Error: {e}")
-        raise ConfigurationError("Missing or invalid .env configuration! Check ADMIN_USER_ID and others.")
-
-    
     TEMP_DIR = "data/temp"
     DATA_FILE = "data/posted_ids.json"
+    DB_FILE = "data/posted_ids.db"
+    UPLOAD_STATE_FILE = "data/uploads.json"
+    MEDIA_CACHE_DIR = "data/cache"
+    PUBLISH_QUEUE_FILE = "data/publish.db"
+    PAUSE_FILE = "data/paused"
+
+    @classmethod
+    def load(cls, override=False):
+        """Reads .env and the environment into the class attributes. `override` lets .env win (used by /reload)."""
+        from dotenv import load_dotenv
+        load_dotenv(override=override)
+        # Read everything first so a bad value leaves the current settings untouched (/reload).
+        values = SimpleNamespace()
+        try:
+            values.TG_API_ID = int(os.getenv("TELEGRAM_API_ID"))
+            values.TG_API_HASH = os.getenv("TELEGRAM_API_HASH")
+            values.TG_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+            values.TG_CHANNEL_ID = int(os.getenv("TELEGRAM_CHANNEL_ID")) if os.getenv("TELEGRAM_CHANNEL_ID") else None
+            values.LOG_CHANNEL_ID = int(os.getenv("TELEGRAM_LOG_CHANNEL_ID")) if os.getenv("TELEGRAM_LOG_CHANNEL_ID") else None
+            values.ADMIN_ID = int(os.getenv("ADMIN_USER_ID"))
+            values.TW_API_KEY = os.getenv("TWITTER_API_KEY")
+            values.TW_API_SECRET = os.getenv("TWITTER_API_SECRET")
+            values.TW_ACCESS_TOKEN = os.getenv("TWITTER_ACCESS_TOKEN")
+            values.TW_ACCESS_SECRET = os.getenv("TWITTER_ACCESS_SECRET")
+            values.TW_BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
+        except (TypeError, ValueError) as e:
+            print(f"Environment Error: {e}")
+            raise ConfigurationError("Missing or invalid .env configuration! Check ADMIN_USER_ID and others.")
+
+        values.ROUTES_FILE = os.getenv("ROUTES_FILE", "data/routes.json")
+        values.TW_WORKERS = int(os.getenv("TWITTER_WORKERS", "4"))
+        values.THREAD_DELAY = float(os.getenv("TWITTER_THREAD_DELAY", "2"))
+        values.TW_RATE_TWEET_CREATE = int(os.getenv("TWITTER_RATE_TWEET_CREATE", "100"))
+        values.TW_RATE_TWEET_DELETE = int(os.getenv("TWITTER_RATE_TWEET_DELETE", "50"))
+        values.TW_RATE_MEDIA_UPLOAD = int(os.getenv("TWITTER_RATE_MEDIA_UPLOAD", "415"))
+        values.TW_DAILY_TWEET_CAP = int(os.getenv("TWITTER_DAILY_TWEET_CAP", "2400"))
+        values.DOWNLOAD_CONCURRENCY = int(os.getenv("DOWNLOAD_CONCURRENCY", "3"))
+        values.UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "3"))
+        values.UPLOAD_PARALLEL_SEGMENTS = int(os.getenv("UPLOAD_PARALLEL_SEGMENTS", "3"))
+        values.FAST_DOWNLOAD_WORKERS = int(os.getenv("FAST_DOWNLOAD_WORKERS", "4"))
+        values.FAST_DOWNLOAD_MIN_SIZE = int(os.getenv("FAST_DOWNLOAD_MIN_MB", "10")) * 1024 * 1024
+        values.MEDIA_SPOOL_MAX = int(os.getenv("MEDIA_SPOOL_MAX_MB", "20")) * 1024 * 1024
+        values.MEDIA_MEMORY_BUDGET = int(os.getenv("MEDIA_MEMORY_BUDGET_MB", "100")) * 1024 * 1024
+        values.MEDIA_CACHE_MAX = int(os.getenv("MEDIA_CACHE_MAX_MB", "0")) * 1024 * 1024
+        values.JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+        values.PUBLISH_WORKERS = int(os.getenv("PUBLISH_WORKERS", "0"))
+        values.JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+        values.JOB_RETRY_BASE = float(os.getenv("JOB_RETRY_BASE", "5"))
+        values.RESTART_DRAIN_TIMEOUT = float(os.getenv("RESTART_DRAIN_TIMEOUT", "30"))
+        values.LOG_BATCH_WINDOW = float(os.getenv("LOG_BATCH_WINDOW", "2"))
+        values.LOG_MAX_BYTES = int(float(os.getenv("LOG_MAX_MB", "10")) * 1024 * 1024)
+        values.LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "5"))
+        values.LOG_JSON = _flag("LOG_JSON")
+        values.BACKFILL_LIMIT = int(os.getenv("BACKFILL_LIMIT", "50"))
+        values.BACKFILL_INTERVAL = float(os.getenv("BACKFILL_INTERVAL", "10"))
+        values.BACKFILL_DRY_RUN = _flag("BACKFILL_DRY_RUN")
+        values.MESSAGE_INDEX_SIZE = int(os.getenv("MESSAGE_INDEX_SIZE", "2000"))
+        values.ALBUM_QUIET = float(os.getenv("ALBUM_QUIET", "1.5"))
+        values.ALBUM_MAX_WAIT = float(os.getenv("ALBUM_MAX_WAIT", "20"))
+        values.EDIT_QUIET = float(os.getenv("EDIT_QUIET", "3"))
+        values.EDIT_MAX_WAIT = float(os.getenv("EDIT_MAX_WAIT", "30"))
+        values.PENDING_ALBUMS_MAX = int(os.getenv("PENDING_ALBUMS_MAX", "500"))
+        values.PENDING_EDITS_MAX = int(os.getenv("PENDING_EDITS_MAX", "1000"))
+        values.METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+        values.METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+        values.IMAGE_PREPROCESS = _flag("IMAGE_PREPROCESS")
+        values.IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+        values.IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "4096"))
+        values.IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+        values.IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "jpeg").lower()
+        values.IMAGE_MIN_SIZE = int(float(os.getenv("IMAGE_MIN_KB", "256")) * 1024)
+        for name, value in vars(values).items():
+            setattr(cls, name, value)
+        cls._loaded = True
+        return cls
 
     @staticmethod
     def ensure_dirs():
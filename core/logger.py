@@ -1,34 +1,88 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
 import os
 from colorlog import ColoredFormatter
+from core.env_loader import Config
 
-def setup_logger(name="TgToTw"):
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
+LOG_FILE = 'logs/app.log'
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line. Tracebacks are already part of the message (QueueHandler.prepare)."""
+    def format(self, record):
+        return json.dumps({
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }, ensure_ascii=False)
 
+_queue = queue.SimpleQueue()
+_listener = None
+
+def setup_logger(name="TgToTw"):
+    """
+    Records are handed to a queue and written by a QueueListener thread, so the
+    event loop never waits on console or disk I/O. Only the console is attached
+    here (no file or config access at import); enable_file_logging() adds the file.
+    """
+    global _listener
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
-    
+
     if logger.handlers:
         return logger
 
-    console_formatter = ColoredFormatter(
-        "%(log_color)s%(asctime)s - [%(levelname)s] - %(message)s",
-        datefmt='%H:%M:%S',
-        reset=True,
-        log_colors={'DEBUG': 'cyan', 'INFO': 'green', 'WARNING': 'yellow', 'ERROR': 'red', 'CRITICAL': 'red,bg_white'}
-    )
+    if _listener is None:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(ColoredFormatter(
+            "%(log_color)s%(asctime)s - [%(levelname)s] - %(message)s",
+            datefmt='%H:%M:%S',
+            reset=True,
+            log_colors={'DEBUG': 'cyan', 'INFO': 'green', 'WARNING': 'yellow', 'ERROR': 'red', 'CRITICAL': 'red,bg_white'}
+        ))
+        _listener = logging.handlers.QueueListener(_queue, console_handler)
+        _listener.start()
+        atexit.register(shutdown_logging)
 
-    file_formatter = logging.Formatter("%(asctime)s - [%(levelname)s] - %(message)s")
+    logger.addHandler(logging.handlers.QueueHandler(_queue))
 
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(console_formatter)
+    return logger
 
-    file_handler = logging.FileHandler('logs/app.log', encoding='utf-8')
+def enable_file_logging(path=LOG_FILE):
+    """Adds the size-rotated log file (settings from Config) to the background listener."""
+    setup_logger()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if Config.LOG_JSON:
+        file_formatter = JsonFormatter()
+    else:
+        file_formatter = logging.Formatter("%(asctime)s - [%(levelname)s] - %(message)s")
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=Config.LOG_MAX_BYTES, backupCount=Config.LOG_BACKUPS, encoding='utf-8'
+    )
     file_handler.setFormatter(file_formatter)
+    _listener.handlers = (*_listener.handlers, file_handler)
 
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+def shutdown_logging():
+    """Writes out everything still queued. Needed before exec, which skips atexit."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
-    return logger
\ No newline at end of file
+def read_tail(path, lines=15, block_size=4096):
+    """Last `lines` lines of a file, read backwards in blocks instead of loading the whole file."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= lines:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    return b"\n".join(data.rstrip(b"\n").split(b"\n")[-lines:]).decode('utf-8', errors='replace')
@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from core.logger import setup_logger
+
+logger = setup_logger()
+
+PREFIX = "tg2x_"
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+class Histogram:
+    """Cumulative Prometheus buckets plus the last `window` samples for percentiles."""
+    def __init__(self, window=1024):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def percentiles(self, points=(50, 95, 99)):
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {p: 0.0 for p in points}
+        return {p: ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in points}
+
+class Metrics:
+    """
+    Process-wide registry of counters, gauges and latency histograms.
+    Safe to update from executor threads. Gauges may be callbacks, evaluated
+    when metrics are read, so queue depths and rate headroom stay current.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.callbacks = []
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items())) if labels else ()
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Times the block into histogram `name`; counts `<name>_errors` if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc(f"{name}_errors", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def register(self, callback):
+        """`callback()` returns an iterable of (name, labels dict, value) gauges."""
+        self.callbacks.append(callback)
+
+    def _collect_gauges(self):
+        gauges = dict(self.gauges)
+        for callback in self.callbacks:
+            try:
+                for name, labels, value in callback():
+                    gauges[self._key(name, labels)] = value
+            except Exception as e:
+                logger.warning(f"Metrics callback failed: {e}")
+        return gauges
+
+    def summary(self, names=None):
+        """{stage: (count, p50, p95, p99)} for every histogram (or those in `names`), labels folded into the name."""
+        with self.lock:
+            items = [(key, h) for key, h in self.histograms.items() if names is None or key[0] in names]
+        result = {}
+        for (name, labels), histogram in sorted(items):
+            label = name + "".join(f"[{v}]" for _, v in labels)
+            p = histogram.percentiles()
+            result[label] = (histogram.count, p[50], p[95], p[99])
+        return result
+
+    def render(self):
+        """Prometheus text exposition format."""
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs: return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        gauges = self._collect_gauges()
+        lines = []
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f"{PREFIX}{name}_total{fmt(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{PREFIX}{name}_seconds_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{PREFIX}{name}_seconds_sum{fmt(labels)} {histogram.sum}")
+                lines.append(f"{PREFIX}{name}_seconds_count{fmt(labels)} {histogram.count}")
+        for (name, labels), value in sorted(gauges.items()):
+            lines.append(f"{PREFIX}{name}{fmt(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Serves /metrics on a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logger.info(f"Metrics endpoint: http://{host}:{server.server_address[1]}/metrics")
+    return server
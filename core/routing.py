@@ -0,0 +1,90 @@
+import json
+import os
+from core.env_loader import Config
+from .exceptions import ConfigurationError
+
+# routes.json account keys -> Config attribute names
+ACCOUNT_FIELDS = {
+    "api_key": "TW_API_KEY",
+    "api_secret": "TW_API_SECRET",
+    "access_token": "TW_ACCESS_TOKEN",
+    "access_secret": "TW_ACCESS_SECRET",
+    "bearer_token": "TW_BEARER_TOKEN",
+    "workers": "TW_WORKERS",
+    "thread_delay": "THREAD_DELAY",
+    "rate_tweet_create": "TW_RATE_TWEET_CREATE",
+    "rate_tweet_delete": "TW_RATE_TWEET_DELETE",
+    "rate_media_upload": "TW_RATE_MEDIA_UPLOAD",
+    "daily_tweet_cap": "TW_DAILY_TWEET_CAP",
+    "upload_concurrency": "UPLOAD_CONCURRENCY",
+}
+
+class AccountConfig:
+    """
+    Config view for one X account: its own credentials, limits and state files.
+    Anything not set here is read from Config.
+    """
+    def __init__(self, name, values):
+        self.ACCOUNT_NAME = name
+        base = os.path.join("data", "accounts", name)
+        self.DATA_DIR = base
+        self.UPLOAD_STATE_FILE = os.path.join(base, "uploads.json")
+        self.MEDIA_CACHE_DIR = os.path.join(base, "cache")
+        for key, value in values.items():
+            if key not in ACCOUNT_FIELDS:
+                raise ConfigurationError(f"Unknown setting '{key}' for account '{name}'.")
+            if isinstance(value, str):
+                value = os.path.expandvars(value)
+            setattr(self, ACCOUNT_FIELDS[key], value)
+
+    def __getattr__(self, item):
+        return getattr(Config, item)
+
+class Route:
+    """
+    One Telegram channel mirrored to one X account, with its own storage file.
+    A channel may appear in several routes to fan out to several accounts.
+    """
+    def __init__(self, channel_id, account, db_path, legacy_file=None):
+        self.channel_id = int(channel_id)
+        self.account = account
+        self.db_path = db_path
+        self.legacy_file = legacy_file
+
+    def __repr__(self):
+        return f"{self.channel_id} -> {self.account}"
+
+def load_routes(path=None):
+    """
+    Returns ({account name: config}, [Route]).
+    Without a routes file the .env channel and credentials form the single 'default' route,
+    using the original data/ paths.
+    """
+    path = path or Config.ROUTES_FILE
+    if not path or not os.path.exists(path):
+        if Config.TG_CHANNEL_ID is None:
+            raise ConfigurationError("Set TELEGRAM_CHANNEL_ID or provide a routes file.")
+        return {"default": Config}, [Route(Config.TG_CHANNEL_ID, "default", Config.DB_FILE, Config.DATA_FILE)]
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigurationError(f"Could not read routes file {path}: {e}")
+
+    accounts = {name: AccountConfig(name, values) for name, values in table.get("accounts", {}).items()}
+    routes = []
+    for entry in table.get("routes", []):
+        name = entry.get("account")
+        if name not in accounts:
+            raise ConfigurationError(f"Route for channel {entry.get('channel')} uses unknown account '{name}'.")
+        os.makedirs(accounts[name].DATA_DIR, exist_ok=True)
+        db_path = os.path.join(accounts[name].DATA_DIR, f"{int(entry['channel'])}.db")
+        routes.append(Route(entry["channel"], name, db_path))
+
+    pairs = [(r.channel_id, r.account) for r in routes]
+    if not routes:
+        raise ConfigurationError(f"Routes file {path} defines no routes.")
+    if len(set(pairs)) != len(pairs):
+        raise ConfigurationError("Duplicate route in routes file.")
+    return accounts, routes
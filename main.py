@@ -1,12 +1,16 @@
 import asyncio
 import sys
-from core.logger import setup_logger
+from core.env_loader import Config
+from core.logger import setup_logger, enable_file_logging
 from telegram.listener import TelegramListener
 from utils.notifier import send_log
+from utils.restarter import restart_bot
 
 logger = setup_logger()
 
 def main():
+    Config.load()
+    enable_file_logging()
     logger.info("============================================")
     logger.info("   STARTING TELEGRAM TO TWITTER BOT       ")
     logger.info("============================================")
@@ -14,6 +18,9 @@ def main():
     try:
         listener = TelegramListener()
         asyncio.run(listener.start())
+        if listener.restart_requested:
+            listener.close()
+            restart_bot()
     except KeyboardInterrupt:
         logger.info("Bot stopped by user.")
         send_log("Bot stopped manually.", "WARNING")
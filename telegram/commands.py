@@ -1,12 +1,26 @@
+import asyncio
 import os
 import time
 import datetime
 from telethon import events
 from core.env_loader import Config
-from utils.restarter import restart_bot
 from utils.auth_manager import AuthManager
+from utils.notifier import get_notifier
+from core.metrics import metrics
+from core.logger import LOG_FILE, read_tail
 
-auth = AuthManager()
+# Hot-path stages summarized in /status; everything else is on the metrics endpoint.
+STATUS_STAGES = ("receive_lag", "album_debounce", "download", "upload", "tweet_create", "tweet_delete", "notifier_send")
+MAX_REPLY = 4000  # Telegram rejects messages over 4096 characters
+
+_auth = None
+
+def get_auth():
+    """The sudoers file is only read when the first command arrives."""
+    global _auth
+    if _auth is None:
+        _auth = AuthManager()
+    return _auth
 
 async def handle_command(event, bot_instance):
     sender = await event.get_sender()
@@ -22,6 +36,7 @@ async def handle_command(event, bot_instance):
     args = command_parts[1:] 
     
     user_id = sender.id
+    auth = get_auth()
     is_owner = auth.is_owner(user_id)
     is_sudo = auth.is_authorized(user_id) 
 
@@ -42,7 +57,8 @@ async def handle_command(event, bot_instance):
                 "📊 `/status` - System stats\n"
                 "🏓 `/ping` - Health check\n"
                 "📋 `/logs` - View logs\n"
-                "🔄 `/restart` - Reboot system\n"
+                "♻️ `/reload` - Reload .env, sudoers & credentials\n"
+                "🔄 `/restart` - Finish running jobs, then reboot\n"
             )
             if is_owner:
                 msg += (
@@ -56,7 +72,7 @@ async def handle_command(event, bot_instance):
             await event.reply("⛔ Access Denied.")
         return
 
-    protected_commands = ['/on', '/off', '/status', '/ping', '/logs', '/restart', '/addsudo', '/rmsudo', '/sudolist']
+    protected_commands = ['/on', '/off', '/status', '/ping', '/logs', '/reload', '/restart', '/addsudo', '/rmsudo', '/sudolist']
     if command in protected_commands:
         if not is_sudo:
             await event.reply("⛔ **Access Denied:** You are not authorized.")
@@ -87,17 +103,77 @@ async def handle_command(event, bot_instance):
             f"🛡 **Role:** {role}\n"
             f"🔋 **State:** {state_icon}\n"
             f"⏱ **Uptime:** `{uptime_str}`\n"
-            f"🐦 **Tweets:** `{bot_instance.total_tweets}`"
+            f"🐦 **Tweets:** `{bot_instance.total_tweets}`\n"
+            f"♻️ **Skipped edits:** `{bot_instance.skipped_edits}`"
         )
+
+        jobs = {}
+        for mirror in bot_instance.mirrors:
+            for state, count in mirror.jobs.stats().items():
+                jobs[state] = jobs.get(state, 0) + count
+        status_msg += (
+            f"\n📦 **Jobs:** `{jobs.get('pending', 0)} pending, {jobs.get('running', 0)} running, "
+            f"{jobs.get('failed', 0)} failed`"
+        )
+        if bot_instance.publisher_pool:
+            alive = sum(p.is_alive() for p in bot_instance.publisher_pool.processes.values())
+            status_msg += (
+                f"\n⚙️ **Publisher processes:** `{alive}/{bot_instance.publisher_pool.workers} alive, "
+                f"{bot_instance.publish_queue.pending()} call(s) in flight`"
+            )
+
+        notifier = get_notifier()
+        if notifier:
+            log_stats = notifier.stats()
+            status_msg += (
+                f"\n📨 **Log queue:** `{log_stats['queued']} queued, {log_stats['sent']} sent, "
+                f"{log_stats['dropped']} dropped`"
+            )
+
+        if bot_instance.preprocessor:
+            images = bot_instance.preprocessor.stats()
+            status_msg += (
+                f"\n🖼 **Images:** `{images['processed']} shrunk, {images['saved'] / 2**20:.1f} MB saved "
+                f"({images['ratio']:.0%} of original), {images['seconds']:.1f}s CPU`"
+            )
+
+        hits = sum(m.recent.hits for m in bot_instance.mirrors)
+        lookups = hits + sum(m.recent.misses for m in bot_instance.mirrors)
+        cached = sum(len(m.recent.entries) for m in bot_instance.mirrors)
+        status_msg += (
+            f"\n🗂 **Message index:** `{cached} cached, {hits / lookups if lookups else 0:.0%} hit rate "
+            f"({hits}/{lookups})`"
+        )
+
+        if len(bot_instance.mirrors) > 1:
+            status_msg += "\n🔀 **Routes:**"
+            for mirror in bot_instance.mirrors:
+                status_msg += f"\n  - `{mirror.route}`: {mirror.total_tweets} tweets"
+
+        for name, publisher in bot_instance.publishers.items():
+            scheduler = publisher.scheduler
+            headroom = ", ".join(f"{bucket} {left}/{cap}" for bucket, (left, cap) in scheduler.headroom().items())
+            account = f" ({name})" if len(bot_instance.publishers) > 1 else ""
+            status_msg += f"\n🚦 **Rate budget{account}:** `{headroom}`"
+            queued = scheduler.projected_waits()
+            if queued:
+                status_msg += f"\n⏳ **Queued calls{account}:** `{len(queued)}`"
+                for label, kind, waited, eta in queued[:5]:
+                    status_msg += f"\n  - `{kind}` {label}: waiting {waited:.0f}s, ETA {eta:.0f}s"
+
+        stages = metrics.summary(STATUS_STAGES)
+        if stages:
+            status_msg += "\n⏲ **Latency (p50 / p95 / p99):**"
+            for stage, (count, p50, p95, p99) in stages.items():
+                status_msg += f"\n  - `{stage}`: {p50:.2f}s / {p95:.2f}s / {p99:.2f}s (n={count})"
+        if len(status_msg) > MAX_REPLY:
+            status_msg = status_msg[:status_msg.rfind("\n", 0, MAX_REPLY)] + "\n…"
         await event.reply(status_msg)
 
     elif command == '/logs':
         try:
-            log_file = 'logs/app.log'
-            if os.path.exists(log_file):
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    last_logs = "".join(lines[-15:]) 
+            if os.path.exists(LOG_FILE):
+                last_logs = read_tail(LOG_FILE, 15)
                 if len(last_logs) > 4000: last_logs = last_logs[-4000:]
                 await event.reply(f"📋 **LOGS**\n\n```text\n{last_logs}\n```")
             else:
@@ -105,9 +181,22 @@ async def handle_command(event, bot_instance):
         except Exception as e:
             await event.reply(f"❌ Error: {e}")
 
+    elif command == '/reload':
+        try:
+            notes = bot_instance.reload()
+            auth.reload()
+        except Exception as e:
+            await event.reply(f"❌ **Reload failed:** `{e}`")
+            return
+        notes.append(f"{len(auth.get_sudo_list())} sudo admin(s)")
+        await event.reply("♻️ **Reloaded.**\n" + "\n".join(f"- {note}" for note in notes))
+
     elif command == '/restart':
-        await event.reply("🔄 **Rebooting...**")
-        restart_bot()
+        await event.reply(
+            f"🔄 **Rebooting...**\nRunning jobs get up to {Config.RESTART_DRAIN_TIMEOUT:.0f}s to finish; "
+            "pending albums and edits carry over."
+        )
+        asyncio.create_task(bot_instance.restart())
 
     elif command == '/addsudo':
         if not is_owner:
@@ -0,0 +1,71 @@
+import asyncio
+from telethon import utils
+from telethon.network import MTProtoSender
+from telethon.tl.alltlobjects import LAYER
+from telethon.tl.functions import InvokeWithLayerRequest
+from telethon.tl.functions.auth import ExportAuthorizationRequest, ImportAuthorizationRequest
+from telethon.tl.functions.upload import GetFileRequest
+from telethon.tl.types import MessageMediaDocument
+from core.logger import setup_logger
+
+logger = setup_logger()
+
+PART_SIZE = 512 * 1024
+
+class ParallelDownloader:
+    """
+    Downloads a document over several MTProto connections at once.
+    Every worker owns its own sender, takes the next free part and writes it at its offset.
+    """
+    def __init__(self, client, workers=4, part_size=PART_SIZE):
+        self.client = client
+        self.workers = workers
+        self.part_size = part_size
+
+    @staticmethod
+    def is_eligible(message, min_size):
+        return (
+            isinstance(message.media, MessageMediaDocument)
+            and message.file is not None
+            and (message.file.size or 0) >= min_size
+        )
+
+    async def _create_sender(self, dc_id):
+        client = self.client
+        dc = await client._get_dc(dc_id)
+        same_dc = dc_id == client.session.dc_id
+        sender = MTProtoSender(client.session.auth_key if same_dc else None, loggers=client._log)
+        await sender.connect(client._connection(
+            dc.ip_address, dc.port, dc.id,
+            loggers=client._log, proxy=client._proxy
+        ))
+        if not same_dc:
+            auth = await client(ExportAuthorizationRequest(dc_id))
+            client._init_request.query = ImportAuthorizationRequest(id=auth.id, bytes=auth.bytes)
+            await sender.send(InvokeWithLayerRequest(LAYER, client._init_request))
+        return sender
+
+    async def download(self, message, out):
+        """Writes the document into the seekable file object `out`."""
+        dc_id, location = utils.get_input_location(message.media)
+        size = message.file.size
+
+        part_count = (size + self.part_size - 1) // self.part_size
+        next_part = iter(range(part_count))
+        senders = await asyncio.gather(*(
+            self._create_sender(dc_id) for _ in range(min(self.workers, part_count))
+        ))
+
+        async def worker(sender):
+            for part in next_part:
+                offset = part * self.part_size
+                result = await sender.send(GetFileRequest(location, offset=offset, limit=self.part_size))
+                out.seek(offset)
+                out.write(result.bytes)
+
+        try:
+            await asyncio.gather(*(worker(s) for s in senders))
+        finally:
+            await asyncio.gather(*(s.disconnect() for s in senders), return_exceptions=True)
+
+        logger.info(f"Parallel download finished: msg {message.id} ({size / 1024 / 1024:.1f} MB, {len(senders)} connections)")
@@ -5,15 +5,26 @@ from telethon import TelegramClient, events
 from telethon.network import connection
 from core.logger import setup_logger
 from core.env_loader import Config
-from utils.id_storage import IDStorage
-from twitter.publisher import TwitterPublisher
-from utils.notifier import send_log
+from core.metrics import start_metrics_server
+from core.routing import load_routes
+from utils.notifier import send_log, reset_notifier
+from utils.media_buffer import MemoryBudget
+from utils.media_cache import MediaCache
+from utils.image_processor import ImagePreprocessor
 from .commands import handle_command
+from .fast_download import ParallelDownloader
+from .mirror import ChannelMirror
 
 logger = setup_logger()
 
 class TelegramListener:
+    """
+    One Telegram connection serving every route in the routing table. Events are
+    dispatched by chat to the ChannelMirror(s) of that channel; each X account has
+    its own publisher, so a slow or rate-limited account does not hold up the others.
+    """
     def __init__(self):
+        Config.ensure_dirs()
         session_path = os.path.join('data', 'auth')
         self.client = TelegramClient(
             session_path,
@@ -21,35 +32,120 @@ class TelegramListener:
             Config.TG_API_HASH,
             connection=connection.ConnectionTcpFull
         )
-        self.twitter = TwitterPublisher(Config)
-        self.storage = IDStorage(Config.DATA_FILE)
-        self.album_queue = {}
-        self.edit_tasks = {}
-        self.album_groups = {}
-        self.recent_posts = {}
         self.start_time = time.time()
-        self.total_tweets = 0
-        self.is_paused = False 
+        self._paused = os.path.exists(Config.PAUSE_FILE)
+        self.accepting = True
+        self.restart_requested = False
+        self.download_slots = asyncio.Semaphore(Config.DOWNLOAD_CONCURRENCY)
+        self.fast_downloader = ParallelDownloader(self.client, workers=Config.FAST_DOWNLOAD_WORKERS)
+        self.memory_budget = MemoryBudget(Config.MEDIA_MEMORY_BUDGET)
+        self.preprocessor = ImagePreprocessor(
+            Config.IMAGE_WORKERS, Config.IMAGE_MAX_SIDE, Config.IMAGE_QUALITY,
+            Config.IMAGE_FORMAT, Config.IMAGE_MIN_SIZE
+        ) if Config.IMAGE_PREPROCESS else None
+
+        self.accounts, self.routes = load_routes()
+        self.publish_queue = None
+        self.publisher_pool = None
+        self.publishers = {}
+        self.media_caches = {}
+        self.mirrors = []
+        self.mirrors_by_chat = {}
+        self.startup = {}
+
+    @property
+    def is_paused(self):
+        return self._paused
+
+    @is_paused.setter
+    def is_paused(self, paused):
+        """/off survives restarts: the state is kept in PAUSE_FILE."""
+        self._paused = paused
+        if paused:
+            open(Config.PAUSE_FILE, 'w').close()
+        elif os.path.exists(Config.PAUSE_FILE):
+            os.remove(Config.PAUSE_FILE)
+
+    def setup_publishing(self, publisher_setup=None):
+        """
+        Builds the publishers and the per-route mirrors (tweepy import, storage files).
+        Runs in a thread while the Telegram login is in flight.
+        `publisher_setup` is handed to the publisher processes (see PublisherPool).
+        """
+        started = time.perf_counter()
+        from twitter.publisher import TwitterPublisher
+        from twitter.remote import PublisherPool, RemotePublisher
+        from utils.publish_queue import PublishQueue
+
+        # PUBLISH_WORKERS > 0: this process only ingests; Twitter calls run in publisher processes.
+        if Config.PUBLISH_WORKERS > 0:
+            self.publish_queue = PublishQueue(Config.PUBLISH_QUEUE_FILE)
+            self.publish_queue.reset()
+            self.publisher_pool = PublisherPool(Config.PUBLISH_WORKERS, Config.PUBLISH_QUEUE_FILE, publisher_setup)
+            self.publisher_pool.start()
+
+        upload_slots = {}
+        for route in self.routes:
+            account = self.accounts[route.account]
+            if route.account not in self.publishers:
+                if self.publish_queue:
+                    self.publishers[route.account] = RemotePublisher(self.publish_queue, route.account, Config.TEMP_DIR)
+                else:
+                    self.publishers[route.account] = TwitterPublisher(account)
+                upload_slots[route.account] = asyncio.Semaphore(account.UPLOAD_CONCURRENCY)
+                self.media_caches[route.account] = MediaCache(account.MEDIA_CACHE_DIR, max_bytes=Config.MEDIA_CACHE_MAX)
+        self.mirrors = [
+            ChannelMirror(
+                self, route, self.publishers[route.account], upload_slots[route.account],
+                self.media_caches[route.account]
+            )
+            for route in self.routes
+        ]
+        for mirror in self.mirrors:
+            self.mirrors_by_chat.setdefault(mirror.channel_id, []).append(mirror)
+        self.startup["publishing"] = time.perf_counter() - started
+
+    async def login(self):
+        started = time.perf_counter()
+        await self.client.start(bot_token=Config.TG_BOT_TOKEN)
+        self.startup["login"] = time.perf_counter() - started
+
+    @property
+    def total_tweets(self):
+        return sum(m.total_tweets for m in self.mirrors)
+
+    @property
+    def skipped_edits(self):
+        return sum(m.skipped_edits for m in self.mirrors)
 
     async def start(self):
         logger.info("Starting Telegram Listener...")
-        Config.ensure_dirs()
-        await self.client.start(bot_token=Config.TG_BOT_TOKEN)
+        started = time.perf_counter()
+        await asyncio.gather(self.login(), asyncio.to_thread(self.setup_publishing))
+        if self.publisher_pool:
+            asyncio.create_task(self.publisher_pool.watch(self.publish_queue))
         send_log("System started successfully. Mode: ONLINE", "START")
-        
+        if Config.METRICS_PORT:
+            start_metrics_server(Config.METRICS_PORT, Config.METRICS_HOST)
+
+        for mirror in self.mirrors:
+            mirror.start_workers()
+            asyncio.create_task(mirror.resume_snapshot())
+
+        channels = list(self.mirrors_by_chat)
         self.client.add_event_handler(
-            self.handle_new_message,
-            events.NewMessage(chats=Config.TG_CHANNEL_ID)
+            self.dispatch("handle_new_message"),
+            events.NewMessage(chats=channels)
         )
 
         self.client.add_event_handler(
-            self.handle_message_edit,
-            events.MessageEdited(chats=Config.TG_CHANNEL_ID)
+            self.dispatch("handle_message_edit"),
+            events.MessageEdited(chats=channels)
         )
 
         self.client.add_event_handler(
-            self.handle_deletion,
-            events.MessageDeleted(chats=Config.TG_CHANNEL_ID)
+            self.dispatch("handle_deletion"),
+            events.MessageDeleted(chats=channels)
         )
 
         self.client.add_event_handler(
@@ -57,189 +153,86 @@ class TelegramListener:
             events.NewMessage(pattern='/')
         )
 
-        logger.info(f"System active. Monitoring: {Config.TG_CHANNEL_ID}")
+        self.startup["ready"] = time.perf_counter() - started
+        logger.info(
+            f"System active in {self.startup['ready']:.2f}s (login {self.startup['login']:.2f}s, "
+            f"publishers {self.startup['publishing']:.2f}s in parallel). "
+            f"Routes: {', '.join(str(m.route) for m in self.mirrors)}"
+        )
+        if Config.BACKFILL_LIMIT > 0:
+            for mirror in self.mirrors:
+                asyncio.create_task(mirror.backfill())
         await self.client.run_until_disconnected()
 
+    def dispatch(self, handler_name):
+        """Event handler that forwards the event to every mirror of its channel."""
+        async def handler(event):
+            if not self.accepting: return
+            for mirror in self.mirrors_by_chat.get(event.chat_id, ()):
+                await getattr(mirror, handler_name)(event)
+        return handler
+
     async def route_command(self, event):
         await handle_command(event, self)
 
-    async def handle_new_message(self, event):
-        if self.is_paused:
-            return 
-
-        msg = event.message
-        if self.storage.is_posted(msg.id): return
-
-        if msg.grouped_id:
-            await self.handle_album_chunk(msg)
-        else:
-            await self.process_single_auto(msg)
-
-    async def handle_deletion(self, event):
-        if self.is_paused: return 
-
-        for msg_id in event.deleted_ids:
-            tweet_id = self.storage.get_tweet_id(msg_id)
-            if tweet_id:
-                if self.twitter.delete_tweet(tweet_id):
-                    self.storage.delete_id(msg_id)
-                    send_log(f"🗑 **DELETED**\n\nTelegram: `{msg_id}`\nTwitter: `{tweet_id}` removed.", "SUCCESS")
-
-    async def handle_message_edit(self, event):
-        if self.is_paused: return
-
-        msg = event.message
-        if not msg: return
-
-        if msg.id in self.edit_tasks:
-            self.edit_tasks[msg.id].cancel()
-        
-        task = asyncio.create_task(self.process_edit_worker(msg.id, msg.grouped_id))
-        self.edit_tasks[msg.id] = task
-
-    async def process_edit_worker(self, msg_id, grouped_id):
+    def reload(self):
+        """
+        Re-reads .env and the routing table and applies new credentials and limits in place;
+        the Telegram connection stays up. Returns notes for the admin.
+        """
+        Config.load(override=True)
+        accounts, routes = load_routes()
+        reset_notifier()
+        notes = []
+
+        if self.publisher_pool:
+            asyncio.create_task(self.restart_publishers())
+            notes.append(f"{self.publisher_pool.workers} publisher process(es) restarting once their running calls finish")
+        for name, publisher in self.publishers.items():
+            if name not in accounts:
+                notes.append(f"account '{name}' was removed: /restart to apply")
+                continue
+            self.accounts[name] = accounts[name]
+            if not self.publisher_pool:
+                publisher.reconfigure(accounts[name])
+        notes.append(f"credentials and limits reloaded for {', '.join(self.publishers)}")
+
+        if sorted((r.channel_id, r.account) for r in routes) != sorted((r.channel_id, r.account) for r in self.routes):
+            notes.append("routing table changed: /restart to apply")
+        logger.info(f"Configuration reloaded: {'; '.join(notes)}.")
+        return notes
+
+    async def restart_publishers(self):
         try:
-            await asyncio.sleep(5)
-            
-            msg = await self.client.get_messages(Config.TG_CHANNEL_ID, ids=msg_id)
-            if not msg: return
-
-            old_tweet_id = self.storage.get_tweet_id(msg.id)
-            if not old_tweet_id:
-                return
-
-            logger.info(f"Auto-Syncing edit for Msg {msg.id}")
-
-            if grouped_id:
-                album_msgs = []
-                if msg.id in self.album_groups:
-                    group_ids = self.album_groups[msg.id]
-                    album_msgs = await self.client.get_messages(Config.TG_CHANNEL_ID, ids=group_ids)
-                    album_msgs = [m for m in album_msgs if m]
-                else:
-                    potential_ids = list(range(msg.id - 9, msg.id + 10))
-                    msgs = await self.client.get_messages(Config.TG_CHANNEL_ID, ids=potential_ids)
-                    album_msgs = [m for m in msgs if m and m.grouped_id == grouped_id]
-
-                album_msgs.sort(key=lambda x: x.id)
-                if not album_msgs: return
-                
-                await self.execute_album_post(album_msgs, old_tweet_id=old_tweet_id)
-            else:
-                await self.execute_single_post(msg, old_tweet_id=old_tweet_id)
-        
-        except asyncio.CancelledError:
-            pass
+            await asyncio.to_thread(self.publisher_pool.restart, Config.RESTART_DRAIN_TIMEOUT)
+            logger.info(f"Restarted {self.publisher_pool.workers} publisher process(es).")
         except Exception as e:
-            logger.error(f"Error in edit worker: {e}")
-        finally:
-            if msg_id in self.edit_tasks:
-                del self.edit_tasks[msg_id]
-
-    async def handle_album_chunk(self, message):
-        gid = message.grouped_id
-        if gid in self.album_queue:
-            self.album_queue[gid].append(message)
-            return
-
-        self.album_queue[gid] = [message]
-        asyncio.create_task(self.process_album_auto(gid))
-
-    async def process_album_auto(self, grouped_id):
-        await asyncio.sleep(5)
-        messages = self.album_queue.pop(grouped_id, [])
-        if not messages: return
-        messages.sort(key=lambda x: x.id)
-        
-        if self.storage.is_posted(messages[0].id): return
-        
-        msg_ids = [m.id for m in messages]
-        for mid in msg_ids:
-            self.album_groups[mid] = msg_ids
-
-        await self.execute_album_post(messages)
-
-    async def execute_album_post(self, messages, old_tweet_id=None):
-        logger.info(f"Posting album with {len(messages)} items.")
-        
-        if old_tweet_id:
-            self.twitter.delete_tweet(old_tweet_id)
-
-        media_files = []
-        text_content = ""
-        message_ids = []
-        quote_id = None
-        first_msg = messages[0]
-        
-        if first_msg.is_reply:
-            reply = await first_msg.get_reply_message()
-            if reply:
-                quote_id = self.storage.get_tweet_id(reply.id)
-
-        for m in messages:
-            message_ids.append(m.id)
-            if m.raw_text and not text_content: 
-                text_content = m.raw_text
-            path = await self.download_media(m)
-            if path: media_files.append(path)
-
-        success_id = self.twitter.post_tweet(text_content, media_files, quote_id=quote_id)
-        
-        if success_id:
-            self.total_tweets += 1
-            for mid in message_ids: 
-                self.storage.add_id(mid, success_id)
-                self.album_groups[mid] = [x.id for x in messages]
-            
-            tweet_link = f"https://x.com/i/status/{success_id}"
-            action = "EDIT SYNCED" if old_tweet_id else "ALBUM POSTED"
-            send_log(f"✅ **{action}**\nLink: [View]({tweet_link})", "SUCCESS")
-        else:
-            send_log("❌ **ERROR:** Album posting failed.", "ERROR")
-        
-        self.cleanup_files(media_files)
-
-    async def process_single_auto(self, message):
-        await self.execute_single_post(message)
-
-    async def execute_single_post(self, message, old_tweet_id=None):
-        if old_tweet_id:
-            self.twitter.delete_tweet(old_tweet_id)
-
-        media_path = await self.download_media(message)
-        media_list = [media_path] if media_path else []
-        quote_id = None
-        if message.is_reply:
-            reply = await message.get_reply_message()
-            if reply:
-                quote_id = self.storage.get_tweet_id(reply.id)
-
-        text_content = message.raw_text
-
-        success_id = self.twitter.post_tweet(text_content, media_list, quote_id=quote_id)
-        
-        if success_id:
-            self.total_tweets += 1
-            self.storage.add_id(message.id, success_id)
-            tweet_link = f"https://x.com/i/status/{success_id}"
-            action = "EDIT SYNCED" if old_tweet_id else "POST SHARED"
-            send_log(f"✅ **{action}**\nLink: [View]({tweet_link})", "SUCCESS")
-        else:
-            send_log(f"❌ **ERROR:** Failed to post ID {message.id}", "ERROR")
-        
-        self.cleanup_files(media_list)
-
-    async def download_media(self, message):
-        if message.media:
-            try:
-                return await self.client.download_media(message, file=Config.TEMP_DIR)
-            except Exception as e:
-                logger.error(f"Download error: {e}")
-                return None
-        return None
-
-    def cleanup_files(self, file_paths):
-        for path in file_paths:
-            if path and os.path.exists(path):
-                try: os.remove(path)
-                except: pass
\ No newline at end of file
+            logger.error(f"Restarting publisher processes failed: {e}")
+
+    async def restart(self, timeout=None):
+        """
+        Graceful restart: stop intake, snapshot debounced albums/edits, give running jobs
+        up to `timeout` seconds, then disconnect. main() re-executes the process.
+        """
+        timeout = Config.RESTART_DRAIN_TIMEOUT if timeout is None else timeout
+        self.accepting = False
+        saved = sum(mirror.save_snapshot() for mirror in self.mirrors)
+        cut_off = sum(await asyncio.gather(*(mirror.drain(timeout) for mirror in self.mirrors)))
+        summary = f"{saved} debounced album(s)/edit(s) saved, {cut_off} running job(s) handed over"
+        logger.warning(f"Restarting: {summary}.")
+        send_log(f"🔄 **RESTART**\n{summary}.", "WARNING")
+        self.restart_requested = True
+        await self.client.disconnect()
+
+    def close(self):
+        """Releases processes and storage once the event loop has stopped."""
+        if self.publisher_pool:
+            self.publisher_pool.stop()
+        if self.preprocessor:
+            self.preprocessor.close()
+        for mirror in self.mirrors:
+            mirror.close()
+        for cache in self.media_caches.values():
+            cache.close()
+        if self.publish_queue:
+            self.publish_queue.close()
@@ -0,0 +1,649 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from telethon.errors import BotMethodInvalidError
+from core.logger import setup_logger
+from core.env_loader import Config
+from core.metrics import metrics
+from utils.id_storage import IDStorage
+from twitter.scheduler import PRIORITY_DELETE, PRIORITY_EDIT, PRIORITY_POST
+from utils.notifier import send_log
+from utils.media_buffer import MediaBuffer
+from utils.media_cache import MediaCache
+from utils.fingerprint import content_fingerprint
+from utils.job_queue import JobQueue
+from utils.message_index import MessageIndex
+from utils.bounded import BoundedDict
+from utils.debounce import Debouncer
+from utils.keyed_lock import KeyedLock
+from .fast_download import ParallelDownloader
+
+logger = setup_logger()
+
+ALBUM_MAX_ITEMS = 10  # Telegram's cap: an album with this many items is complete
+DEBOUNCE_TTL_MARGIN = 30  # seconds a closed debouncer may stay tracked past its max wait
+
+class ChannelMirror:
+    """
+    Mirrors one Telegram channel to one X account (a route). Owns the route's
+    storage, job queue and in-memory state; the Telegram client, download slots
+    and memory budget are shared through `bot`, the publisher (rate budget,
+    upload slots) and media cache through the account.
+    """
+    def __init__(self, bot, route, twitter, upload_slots, media_cache):
+        self.bot = bot
+        self.route = route
+        self.channel_id = route.channel_id
+        self.account = route.account
+        self.twitter = twitter
+        self.upload_slots = upload_slots
+        self.storage = IDStorage(route.db_path, legacy_file=route.legacy_file)
+        # Debouncers for albums still receiving items and messages still being edited;
+        # the caps guard against bursts. An evicted debouncer is flushed, not dropped.
+        self.album_queue, self.edit_tasks = self.debounce_maps()
+        self.recent = MessageIndex(Config.MESSAGE_INDEX_SIZE)
+        self.total_tweets = 0
+        self.skipped_edits = 0
+        self.media_cache = media_cache
+        self.jobs = JobQueue(route.db_path, max_attempts=Config.JOB_MAX_ATTEMPTS, retry_base=Config.JOB_RETRY_BASE)
+        self.job_ready = asyncio.Event()
+        self.job_messages = {}
+        self.job_workers = []
+        # Jobs touching the same messages run one at a time (an edit re-posting while a delete reads the mapping).
+        self.message_locks = KeyedLock()
+        self.draining = False
+        self.snapshot_path = os.path.splitext(route.db_path)[0] + ".pending.json"
+        metrics.register(self._gauges)
+
+    @staticmethod
+    def debounce_maps():
+        flush = lambda key, timer: timer.flush()
+        return (
+            BoundedDict(Config.PENDING_ALBUMS_MAX, ttl=Config.ALBUM_MAX_WAIT + DEBOUNCE_TTL_MARGIN, on_evict=flush),
+            BoundedDict(Config.PENDING_EDITS_MAX, ttl=Config.EDIT_MAX_WAIT + DEBOUNCE_TTL_MARGIN, on_evict=flush),
+        )
+
+    @property
+    def client(self):
+        return self.bot.client
+
+    def _gauges(self):
+        labels = {"channel": self.channel_id, "account": self.account}
+        yield "albums_pending", labels, self.album_queue.size()
+        yield "edits_pending", labels, self.edit_tasks.size()
+        for state, count in self.jobs.stats().items():
+            yield "jobs", {**labels, "state": state}, count
+        yield "message_index_hit_rate", labels, self.recent.stats()["hit_rate"]
+
+    def start_workers(self):
+        self.jobs.recover()
+        self.jobs.purge(7 * 24 * 3600)
+        self.job_workers = [asyncio.create_task(self.job_worker()) for _ in range(Config.JOB_WORKERS)]
+
+    def save_snapshot(self):
+        """
+        Writes the albums and edits still in their debounce window to disk (graceful restart)
+        and drops them here; the next process picks them up in resume_snapshot().
+        Queued jobs need nothing: they already live in the job queue.
+        """
+        albums = [[m.id for m in timer.items] for timer in self.album_queue.values()]
+        edits = list(self.edit_tasks)
+        for timer in [*self.album_queue.values(), *self.edit_tasks.values()]:
+            timer.cancel()
+        self.album_queue.clear()
+        self.edit_tasks.clear()
+        if not albums and not edits:
+            return 0
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"albums": albums, "edits": edits, "saved_at": time.time()}, f)
+        os.replace(tmp_path, self.snapshot_path)
+        return len(albums) + len(edits)
+
+    async def resume_snapshot(self):
+        """Queues the albums and edits a previous process left in its restart snapshot."""
+        if not os.path.exists(self.snapshot_path): return
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Ignoring unreadable restart snapshot {self.snapshot_path}: {e}")
+            snapshot = {}
+        os.remove(self.snapshot_path)
+        albums, edits = snapshot.get("albums", []), snapshot.get("edits", [])
+        ids = [msg_id for group in albums for msg_id in group] + edits
+        if not ids: return
+
+        fetched = await self.client.get_messages(self.channel_id, ids=ids)
+        by_id = {m.id: m for m in fetched if m}
+        self.recent.add_many(by_id.values())
+        for group in albums:
+            messages = [by_id[msg_id] for msg_id in sorted(group) if msg_id in by_id]
+            if messages and not self.storage.is_posted(messages[0].id):
+                self.enqueue_post(messages)
+        for msg_id in edits:
+            msg = by_id.get(msg_id)
+            if msg and self.storage.is_posted(msg_id):
+                self.jobs.enqueue(
+                    "edit", {"message_id": msg_id, "grouped_id": msg.grouped_id}, f"edit:{msg_id}", dedupe_states=("pending",)
+                )
+        self.job_ready.set()
+        logger.info(f"Resumed {len(albums)} album(s) and {len(edits)} edit(s) for {self.route} from the restart snapshot.")
+
+    async def drain(self, timeout):
+        """
+        Stops the workers once their current job is done, waiting at most `timeout` seconds.
+        Jobs cut off at the deadline stay 'running' and are recovered (with their thread
+        checkpoint) by the next process. Returns how many were cut off.
+        """
+        self.draining = True
+        self.job_ready.set()
+        if not self.job_workers: return 0
+        _, pending = await asyncio.wait(self.job_workers, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        return len(pending)
+
+    def close(self):
+        self.jobs.close()
+        self.storage.close()
+
+    async def fetch_missed(self, after_id, limit):
+        """Channel messages newer than after_id, oldest first."""
+        try:
+            return [m async for m in self.client.iter_messages(
+                self.channel_id, min_id=after_id, reverse=True, limit=limit
+            )]
+        except BotMethodInvalidError:
+            pass
+
+        # Bot accounts cannot read history; page through ids directly instead.
+        found, next_id = [], after_id + 1
+        while len(found) < limit:
+            batch = await self.client.get_messages(self.channel_id, ids=list(range(next_id, next_id + 100)))
+            batch = [m for m in batch if m]
+            if not batch: break
+            found.extend(batch)
+            next_id += 100
+        return found[:limit]
+
+    async def backfill(self):
+        """
+        Mirrors channel posts published while the bot was down. Posts that arrived during /off,
+        or while the bot was down paused, are skipped.
+        """
+        last_id = self.storage.get_max_message_id()
+        if last_id is None:
+            return
+        last_id = max(last_id, self.storage.get_ignored_until() or 0)
+
+        # Started paused: everything published during the downtime is ignored, however much.
+        limit = sys.maxsize if self.bot.is_paused else Config.BACKFILL_LIMIT
+        try:
+            missed = await self.fetch_missed(last_id, limit)
+        except Exception as e:
+            logger.error(f"Backfill failed: {e}")
+            return
+        if self.bot.is_paused:
+            if missed:
+                self.storage.mark_ignored(missed[-1].id)
+                logger.info(f"Paused: {len(missed)} post(s) after Msg {last_id} in {self.route} will not be mirrored.")
+            return
+        missed = [m for m in missed if not m.action and not self.storage.is_posted(m.id)]
+        self.recent.add_many(missed)
+        if not missed:
+            return
+
+        groups, albums = [], {}
+        for m in missed:
+            if m.grouped_id:
+                if m.grouped_id not in albums:
+                    albums[m.grouped_id] = []
+                    groups.append(albums[m.grouped_id])
+                albums[m.grouped_id].append(m)
+            else:
+                groups.append([m])
+
+        mode = "DRY RUN" if Config.BACKFILL_DRY_RUN else "queued"
+        logger.info(f"Backfill ({mode}) for {self.route}: {len(groups)} post(s) after Msg {last_id}.")
+        for index, group in enumerate(groups):
+            ids = [m.id for m in group]
+            if Config.BACKFILL_DRY_RUN:
+                logger.info(f"Backfill would post Msg {ids}")
+                continue
+            self.enqueue_post(group, delay=index * Config.BACKFILL_INTERVAL)
+        send_log(f"⏪ **BACKFILL** ({mode})\n`{self.route}`: {len(groups)} missed post(s) since Msg `{last_id}`.", "INFO")
+
+    async def handle_new_message(self, event):
+        msg = event.message
+        metrics.inc("events", kind="new")
+        if msg.date:
+            metrics.observe("receive_lag", max(0.0, time.time() - msg.date.timestamp()))
+        self.recent.add(msg)
+        if self.bot.is_paused:
+            self.storage.mark_ignored(msg.id)
+            return 
+
+        if self.storage.is_posted(msg.id): return
+
+        if msg.grouped_id:
+            await self.handle_album_chunk(msg)
+        else:
+            await self.process_single_auto(msg)
+
+    async def handle_deletion(self, event):
+        metrics.inc("events", kind="delete")
+        self.recent.discard(event.deleted_ids)
+        deleted = set(event.deleted_ids)
+        # Queued posts must not publish them: trim the jobs and forget their cached copies.
+        self.jobs.drop_messages("post", deleted)
+        for job_id, messages in list(self.job_messages.items()):
+            if any(m.id in deleted for m in messages):
+                del self.job_messages[job_id]
+        if self.bot.is_paused: return 
+
+        # Posts still in the queue here are running or half-posted; the delete runs after them.
+        queued = {mid for payload in self.jobs.active_payloads("post") for mid in payload["message_ids"]}
+        deleted_ids = [mid for mid in sorted(deleted) if mid in queued or self.storage.is_posted(mid)]
+        if not deleted_ids: return
+        self.jobs.enqueue("delete", {"message_ids": deleted_ids}, "delete:" + ",".join(map(str, sorted(deleted_ids))))
+        self.job_ready.set()
+
+    async def run_delete_job(self, job):
+        """Deletes each affected post once (album items share a tweet), whole threads included, concurrently."""
+        by_tweet = {}
+        for msg_id in job["payload"]["message_ids"]:
+            tweet_id = self.storage.get_tweet_id(msg_id)
+            if tweet_id:
+                by_tweet.setdefault(tweet_id, []).append(msg_id)
+        if not by_tweet: return True
+
+        roots = list(by_tweet)
+        results = await asyncio.gather(*(self.delete_thread(root) for root in roots))
+        done = [root for root, ok in zip(roots, results) if ok]
+        self.storage.delete_ids([mid for root in done for mid in by_tweet[root]])
+
+        if done:
+            lines = "\n".join(f"Telegram: `{', '.join(map(str, by_tweet[root]))}` → Twitter: `{root}`" for root in done[:20])
+            more = f"\n…and {len(done) - 20} more." if len(done) > 20 else ""
+            send_log(f"🗑 **DELETED** {len(done)} post(s)\n\n{lines}{more}", "SUCCESS")
+        return len(done) == len(roots)
+
+    async def delete_thread(self, root_tweet_id, priority=PRIORITY_DELETE):
+        """Deletes a mirrored post and every reply it was split into."""
+        results = await self.twitter.delete_tweets(self.storage.get_thread(root_tweet_id), priority)
+        return all(results.values())
+
+    async def handle_message_edit(self, event):
+        msg = event.message
+        if not msg: return
+        metrics.inc("events", kind="edit")
+        self.recent.add(msg)
+        if self.bot.is_paused: return
+
+        timer = self.edit_tasks.get(msg.id)
+        if timer and not timer.reason:
+            metrics.observe("edit_gap", timer.add(msg.grouped_id))
+            return
+
+        timer = Debouncer(Config.EDIT_QUIET, Config.EDIT_MAX_WAIT)
+        timer.add(msg.grouped_id)
+        self.edit_tasks[msg.id] = timer
+        asyncio.create_task(self.process_edit_worker(msg.id, timer))
+
+    async def process_edit_worker(self, msg_id, timer):
+        """
+        Syncs the edit once the message has stopped changing (see Debouncer). If the
+        message's post job is still queued or running, waits for it: a queued post picks up
+        the edited text itself, one already running needs the edit synced afterwards.
+        """
+        try:
+            reason = await timer.wait()
+            metrics.observe("edit_debounce", timer.elapsed(), reason=reason)
+            while reason != "cancelled" and not self.storage.is_posted(msg_id):
+                if not self.post_in_queue(msg_id): return
+                await asyncio.sleep(max(Config.EDIT_QUIET, 1))
+                reason = timer.reason
+            if reason == "cancelled": return
+
+            self.jobs.enqueue("edit", {"message_id": msg_id, "grouped_id": timer.items[-1]}, f"edit:{msg_id}",
+                              dedupe_states=("pending",))
+            self.job_ready.set()
+        finally:
+            if self.edit_tasks.get(msg_id) is timer:
+                del self.edit_tasks[msg_id]
+
+    def post_in_queue(self, msg_id):
+        return any(msg_id in payload["message_ids"] for payload in self.jobs.active_payloads("post"))
+
+    async def run_edit_job(self, job):
+        msg_id = job["payload"]["message_id"]
+        grouped_id = job["payload"]["grouped_id"]
+        progress = self.job_progress(job)
+
+        msg = self.recent.get(msg_id)
+        if not msg:
+            msg = await self.client.get_messages(self.channel_id, ids=msg_id)
+            if not msg: return True
+            self.recent.add(msg)
+
+        old_tweet_id = self.storage.get_tweet_id(msg.id)
+        if not old_tweet_id:
+            return True
+
+        if grouped_id:
+            group_ids = self.storage.get_message_ids(old_tweet_id)
+            if len(group_ids) > 1:
+                album_msgs = self.recent.get_many(group_ids)
+                if album_msgs is None:
+                    album_msgs = await self.client.get_messages(self.channel_id, ids=group_ids)
+                    album_msgs = [m for m in album_msgs if m]
+                    self.recent.add_many(album_msgs)
+            else:
+                album_msgs = self.recent.get_group(grouped_id)
+                if not album_msgs:
+                    potential_ids = list(range(msg.id - 9, msg.id + 10))
+                    msgs = await self.client.get_messages(self.channel_id, ids=potential_ids)
+                    album_msgs = [m for m in msgs if m and m.grouped_id == grouped_id]
+                    self.recent.add_many(album_msgs)
+
+            album_msgs.sort(key=lambda x: x.id)
+            if not album_msgs: return True
+            if self.is_unchanged(msg.id, album_msgs): return True
+
+            logger.info(f"Auto-Syncing edit for Msg {msg.id}")
+            return await self.execute_album_post(album_msgs, old_tweet_id=old_tweet_id, **progress)
+        else:
+            if self.is_unchanged(msg.id, [msg]): return True
+
+            logger.info(f"Auto-Syncing edit for Msg {msg.id}")
+            return await self.execute_single_post(msg, old_tweet_id=old_tweet_id, **progress)
+
+    def is_unchanged(self, msg_id, messages):
+        """True when the edit did not change text, media or reply target."""
+        stored = self.storage.get_fingerprint(msg_id)
+        if stored and stored == content_fingerprint(messages):
+            self.skipped_edits += 1
+            logger.info(f"Edit of Msg {msg_id} has no visible changes, skipping re-post.")
+            return True
+        return False
+
+    async def handle_album_chunk(self, message):
+        gid = message.grouped_id
+        timer = self.album_queue.get(gid)
+        if timer and not timer.reason:
+            metrics.observe("album_gap", timer.add(message))
+            return
+
+        timer = Debouncer(Config.ALBUM_QUIET, Config.ALBUM_MAX_WAIT, limit=ALBUM_MAX_ITEMS)
+        timer.add(message)
+        self.album_queue[gid] = timer
+        asyncio.create_task(self.process_album_auto(gid, timer))
+
+    async def process_album_auto(self, grouped_id, timer):
+        """Posts the album once its items stop arriving, it is full, or ALBUM_MAX_WAIT runs out."""
+        reason = await timer.wait()
+        if self.album_queue.get(grouped_id) is timer:
+            del self.album_queue[grouped_id]
+        metrics.observe("album_debounce", timer.elapsed(), reason=reason)
+        if reason == "cancelled": return
+        if reason == "max_wait":
+            logger.warning(f"Album {grouped_id} still receiving items after {Config.ALBUM_MAX_WAIT:.0f}s; "
+                           f"posting the {len(timer.items)} received.")
+        messages = sorted(timer.items, key=lambda x: x.id)
+        
+        if self.storage.is_posted(messages[0].id): return
+
+        self.enqueue_post(messages)
+
+    def enqueue_post(self, messages, delay=0):
+        job_id = self.jobs.enqueue("post", {"message_ids": [m.id for m in messages]}, f"post:{messages[0].id}", delay=delay)
+        self.job_messages[job_id] = messages
+        self.job_ready.set()
+
+    async def run_post_job(self, job):
+        # The index first: edits made while the job was queued refresh it.
+        msg_ids = job["payload"]["message_ids"]
+        messages = self.recent.get_many(msg_ids) or self.job_messages.get(job["id"])
+        if not messages:
+            fetched = await self.client.get_messages(self.channel_id, ids=msg_ids)
+            messages = sorted((m for m in fetched if m), key=lambda m: m.id)
+            self.recent.add_many(messages)
+
+        progress = self.job_progress(job)
+        if progress["posted_ids"] and len(messages) < len(msg_ids):
+            # Messages were deleted after part of the thread went out: take it down and start over.
+            results = await self.twitter.delete_tweets(progress["posted_ids"], PRIORITY_DELETE)
+            if not all(results.values()): return False
+            self.jobs.checkpoint(job["id"], {})
+            progress["posted_ids"] = None
+        if not messages: return True
+        if self.storage.is_posted(messages[0].id): return True
+
+        if messages[0].grouped_id:
+            return await self.execute_album_post(messages, **progress)
+        return await self.execute_single_post(messages[0], **progress)
+
+    def job_progress(self, job):
+        """Thread tweets already created by an earlier attempt, plus a hook to record new ones."""
+        return {
+            "posted_ids": job["result"].get("tweet_ids"),
+            "on_posted": lambda ids: self.jobs.checkpoint(job["id"], {"tweet_ids": ids}),
+        }
+
+    def job_message_ids(self, job):
+        """Messages a job reads or rewrites; album edits and deletions cover every item of the post."""
+        payload = job["payload"]
+        ids = set(payload.get("message_ids") or [payload["message_id"]])
+        if job["kind"] != "post":
+            for tweet_id in {self.storage.get_tweet_id(msg_id) for msg_id in list(ids)} - {None}:
+                ids.update(self.storage.get_message_ids(tweet_id))
+        return ids
+
+    async def job_worker(self):
+        handlers = {"post": self.run_post_job, "edit": self.run_edit_job, "delete": self.run_delete_job}
+        while not self.draining:
+            self.job_ready.clear()
+            job = self.jobs.claim()
+            if not job:
+                try:
+                    await asyncio.wait_for(self.job_ready.wait(), timeout=t if (t := self.jobs.next_due_in()) is not None else 5)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            error = "handler reported failure"
+            try:
+                async with self.message_locks.hold(self.job_message_ids(job)):
+                    with metrics.timer("job", kind=job["kind"]):
+                        ok = await handlers[job["kind"]](job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in {job['kind']} job {job['id']}: {e}")
+                ok, error = False, e
+            finally:
+                self.job_messages.pop(job["id"], None)
+
+            if ok:
+                self.jobs.complete(job["id"])
+            elif self.jobs.fail(job["id"], error) == "failed":
+                send_log(f"❌ **ERROR:** `{job['key']}` failed after {self.jobs.max_attempts} attempts.\n{error}", "ERROR")
+            else:
+                logger.warning(f"Job {job['key']} failed, retry scheduled.")
+
+    async def execute_album_post(self, messages, old_tweet_id=None, posted_ids=None, on_posted=None):
+        logger.info(f"Posting album with {len(messages)} items.")
+        started = time.perf_counter()
+        priority = PRIORITY_EDIT if old_tweet_id else PRIORITY_POST
+        
+        if old_tweet_id and not posted_ids:
+            await self.delete_thread(old_tweet_id, priority)
+
+        text_content = ""
+        message_ids = []
+        quote_id = self.quote_target(messages[0])
+
+        for m in messages:
+            message_ids.append(m.id)
+            if m.raw_text and not text_content: 
+                text_content = m.raw_text
+
+        thread, record = self.thread_recorder(posted_ids, on_posted)
+        media_ids = [] if posted_ids else await self.prepare_media(messages, priority)
+        if not media_ids and not posted_ids and not text_content:
+            logger.error("Album media could not be prepared.")
+            return False
+
+        success_id = await self.twitter.post_tweet(
+            text_content, media_ids=media_ids, quote_id=quote_id, priority=priority,
+            posted_ids=posted_ids, on_posted=record
+        )
+        
+        if success_id:
+            self.total_tweets += 1
+            elapsed = time.perf_counter() - started
+            metrics.observe("post_total", elapsed, kind="album")
+            logger.info(f"Album time-to-tweet: {elapsed:.2f}s ({len(messages)} items)")
+            self.storage.add_ids(
+                ((mid, success_id) for mid in message_ids),
+                fingerprint=content_fingerprint(messages), thread_ids=thread
+            )
+            if old_tweet_id: self.storage.drop_thread(old_tweet_id)
+            
+            tweet_link = f"https://x.com/i/status/{success_id}"
+            action = "EDIT SYNCED" if old_tweet_id else "ALBUM POSTED"
+            send_log(f"✅ **{action}**\nLink: [View]({tweet_link})", "SUCCESS")
+            return True
+        logger.error("Album posting failed.")
+        return False
+
+    @staticmethod
+    def thread_recorder(posted_ids, on_posted):
+        """Collects every tweet id post_tweet creates (and still forwards them to on_posted)."""
+        thread = list(posted_ids or [])
+
+        def record(ids):
+            thread[:] = ids
+            if on_posted: on_posted(ids)
+        return thread, record
+
+    def quote_target(self, message):
+        """Tweet id of the message this one replies to (reply_to_msg_id needs no round-trip)."""
+        if not message.is_reply or not message.reply_to_msg_id:
+            return None
+        return self.storage.get_tweet_id(message.reply_to_msg_id)
+
+    async def process_single_auto(self, message):
+        self.enqueue_post([message])
+
+    async def execute_single_post(self, message, old_tweet_id=None, posted_ids=None, on_posted=None):
+        started = time.perf_counter()
+        priority = PRIORITY_EDIT if old_tweet_id else PRIORITY_POST
+        if old_tweet_id and not posted_ids:
+            await self.delete_thread(old_tweet_id, priority)
+
+        media_ids = [] if posted_ids else await self.prepare_media([message], priority)
+        if message.media and not media_ids and not posted_ids and not message.raw_text:
+            logger.error(f"Media of Msg {message.id} could not be prepared.")
+            return False
+        quote_id = self.quote_target(message)
+        thread, record = self.thread_recorder(posted_ids, on_posted)
+
+        text_content = message.raw_text
+
+        success_id = await self.twitter.post_tweet(
+            text_content, media_ids=media_ids, quote_id=quote_id, priority=priority,
+            posted_ids=posted_ids, on_posted=record
+        )
+        
+        if success_id:
+            self.total_tweets += 1
+            metrics.observe("post_total", time.perf_counter() - started, kind="single")
+            self.storage.add_ids(
+                [(message.id, success_id)], fingerprint=content_fingerprint([message]), thread_ids=thread
+            )
+            if old_tweet_id: self.storage.drop_thread(old_tweet_id)
+            tweet_link = f"https://x.com/i/status/{success_id}"
+            action = "EDIT SYNCED" if old_tweet_id else "POST SHARED"
+            send_log(f"✅ **{action}**\nLink: [View]({tweet_link})", "SUCCESS")
+            return True
+        if not text_content and not media_ids:
+            return True
+        logger.error(f"Failed to post ID {message.id}")
+        return False
+
+    async def prepare_media(self, messages, priority=PRIORITY_POST):
+        """
+        Streams each item through download -> upload as soon as its download finishes.
+        Both stages are bounded by their own semaphores; results keep the message order.
+        Each buffer is released as soon as its upload finishes.
+        Media already uploaded (e.g. on edit-sync) is served from the media cache.
+        """
+        async def fetch_and_upload(message):
+            key = MediaCache.key_for(message)
+            media_id = self.media_cache.get_media_id(key)
+            if media_id: return media_id
+
+            local_path = self.media_cache.get_local_path(key)
+            if local_path:
+                buffer = MediaBuffer.from_path(local_path)
+            else:
+                async with self.bot.download_slots:
+                    buffer = await self.download_media(message)
+            if not buffer: return None
+            try:
+                if self.bot.preprocessor and not local_path:
+                    buffer = await self.bot.preprocessor.process(buffer)
+                async with self.upload_slots:
+                    media_id = await self.twitter.uploader.upload_file(buffer, priority)
+                if media_id:
+                    await asyncio.to_thread(self.media_cache.put, key, media_id, buffer)
+                return media_id
+            finally:
+                buffer.close()
+
+        results = await asyncio.gather(*(fetch_and_upload(m) for m in messages))
+        return [media_id for media_id in results if media_id]
+
+    async def download_media(self, message):
+        """
+        Downloads into a MediaBuffer (RAM up to MEDIA_SPOOL_MAX_MB, anonymous temp file above).
+        Returns None for media without a file (link previews without a photo, polls, geo, dice).
+        """
+        if not message.media or not message.file:
+            return None
+
+        buffer = MediaBuffer.for_message(message, self.bot.memory_budget, Config.MEDIA_SPOOL_MAX, Config.TEMP_DIR)
+        if Config.FAST_DOWNLOAD_WORKERS > 1 and ParallelDownloader.is_eligible(message, Config.FAST_DOWNLOAD_MIN_SIZE):
+            try:
+                with metrics.timer("download", mode="parallel"):
+                    await self.bot.fast_downloader.download(message, buffer.file)
+                return self._downloaded(message, buffer)
+            except Exception as e:
+                logger.warning(f"Parallel download failed, falling back to single stream: {e}")
+                buffer.reset()
+        try:
+            with metrics.timer("download", mode="single"):
+                result = await self.client.download_media(message, file=buffer.file)
+            if result is None:
+                buffer.close()
+                return None
+            return self._downloaded(message, buffer)
+        except Exception as e:
+            logger.error(f"Download error: {e}")
+            buffer.close()
+            return None
+
+    @staticmethod
+    def _downloaded(message, buffer):
+        size = buffer.size
+        if not size:
+            logger.warning(f"Media of Msg {message.id} downloaded empty, skipping it.")
+            buffer.close()
+            return None
+        metrics.inc("download_bytes", size)
+        return buffer
\ No newline at end of file
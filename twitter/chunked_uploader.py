@@ -0,0 +1,149 @@
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import time
+import tweepy
+from core.exceptions import UploadError
+from core.logger import setup_logger
+from .scheduler import PRIORITY_POST
+
+logger = setup_logger()
+
+SEGMENT_SIZE = 4 * 1024 * 1024
+
+class ChunkedUploader:
+    """
+    INIT / APPEND / FINALIZE / STATUS media upload with several APPEND segments in flight.
+    Acknowledged segments are written to a small state file so a failed or interrupted
+    upload resumes from where it stopped instead of starting over.
+    """
+    def __init__(self, api_v1, executor, state_file, parallel=3, retries=3, segment_size=SEGMENT_SIZE, call=None):
+        self.api = api_v1
+        self.executor = executor
+        self.call = call
+        self.state_file = state_file
+        self.parallel = parallel
+        self.retries = retries
+        self.segment_size = segment_size
+        self.sessions = self._load_state()
+
+    def _load_state(self):
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            now = time.time()
+            return {k: v for k, v in data.items() if v.get("expires_at", 0) > now}
+        except Exception as e:
+            logger.error(f"Failed to load upload sessions: {e}")
+            return {}
+
+    def _save_state(self):
+        try:
+            tmp_path = self.state_file + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.sessions, f)
+            os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            logger.error(f"Failed to save upload sessions: {e}")
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    @staticmethod
+    def _fingerprint(buffer):
+        digest = hashlib.sha1()
+        offset = 0
+        while True:
+            block = buffer.read_at(offset, 1024 * 1024)
+            if not block: break
+            digest.update(block)
+            offset += len(block)
+        return digest.hexdigest()
+
+    async def _request(self, label, priority, func, *args, **kwargs):
+        """One upload call, through the publisher's scheduler so it shares the media budget and its 429 handling."""
+        if self.call:
+            return await self.call(("media_upload",), priority, f"upload {label}", func, *args, **kwargs)
+        return await self._run(func, *args, **kwargs)
+
+    async def _with_retries(self, label, priority, func, *args, **kwargs):
+        """Repeats a call that never got a response (connection reset, timeout); HTTP errors are raised as-is."""
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._request(label, priority, func, *args, **kwargs)
+            except tweepy.HTTPException:
+                raise
+            except tweepy.TweepyException as e:
+                if attempt == self.retries:
+                    raise
+                delay = 2 ** attempt
+                logger.warning(f"{label} failed ({e}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+
+    async def _start_session(self, key, total_bytes, media_type, media_category, priority):
+        session = self.sessions.get(key)
+        if session and session["expires_at"] > time.time() + 60:
+            logger.info(f"Resuming upload {session['media_id']} ({len(session['acked'])}/{session['segments']} segments done)")
+            return session
+
+        media = await self._with_retries(
+            "INIT", priority, self.api.chunked_upload_init, total_bytes, media_type, media_category=media_category
+        )
+        session = {
+            "media_id": media.media_id,
+            "expires_at": time.time() + getattr(media, "expires_after_secs", 86400),
+            "segments": max(1, -(-total_bytes // self.segment_size)),
+            "acked": [],
+        }
+        self.sessions[key] = session
+        self._save_state()
+        return session
+
+    async def upload(self, buffer, media_type, media_category=None, priority=PRIORITY_POST):
+        total_bytes = buffer.size
+        key = f"{total_bytes}:{await self._run(self._fingerprint, buffer)}"
+        session = await self._start_session(key, total_bytes, media_type, media_category, priority)
+        media_id = session["media_id"]
+
+        slots = asyncio.Semaphore(self.parallel)
+        acked = set(session["acked"])
+
+        async def append(index):
+            async with slots:
+                chunk = await self._run(buffer.read_at, index * self.segment_size, self.segment_size)
+                await self._with_retries(
+                    f"APPEND {index}", priority, self.api.chunked_upload_append,
+                    media_id, (buffer.name, chunk), index
+                )
+                session["acked"].append(index)
+                self._save_state()
+
+        try:
+            results = await asyncio.gather(
+                *(append(i) for i in range(session["segments"]) if i not in acked),
+                return_exceptions=True
+            )
+            errors = [r for r in results if isinstance(r, Exception)]
+            if errors: raise errors[0]
+            media = await self._with_retries("FINALIZE", priority, self.api.chunked_upload_finalize, media_id)
+        except Exception as e:
+            raise UploadError(f"Chunked upload of {buffer.name} stopped at "
+                              f"{len(session['acked'])}/{session['segments']} segments: {e}")
+
+        self.sessions.pop(key, None)
+        self._save_state()
+
+        info = getattr(media, "processing_info", None)
+        while info and info.get("state") in ("pending", "in_progress"):
+            await asyncio.sleep(info.get("check_after_secs", 1))
+            media = await self._with_retries("STATUS", priority, self.api.get_media_upload_status, media_id)
+            info = getattr(media, "processing_info", None)
+
+        if info and info.get("state") == "failed":
+            raise UploadError(f"Media processing failed for {buffer.name}: {info.get('error')}")
+        return media_id
@@ -1,25 +1,45 @@
+import asyncio
+import mimetypes
 import tweepy
-import os
 from core.logger import setup_logger
+from core.metrics import metrics
+from .scheduler import PRIORITY_POST
 
 logger = setup_logger()
 
 class MediaUploader:
-    def __init__(self, api_v1):
+    def __init__(self, api_v1, executor=None, chunked=None, call=None):
         self.api = api_v1
+        self.executor = executor
+        self.chunked = chunked
+        self.call = call
 
-    def upload_media(self, file_paths):
-        media_ids = []
-        for path in file_paths:
-            try:
-                if not os.path.exists(path): continue
- 
-                if path.lower().endswith(('.mp4', '.mov', '.gif')):
-                    media = self.api.media_upload(path, chunked=True, media_category='tweet_video')
+    def _simple_upload(self, buffer):
+        with buffer.lock:
+            buffer.file.seek(0)
+            return self.api.media_upload(buffer.name, file=buffer.file)
+
+    async def upload_file(self, buffer, priority=PRIORITY_POST):
+        """Uploads a single MediaBuffer off the event loop. Returns the media id or None."""
+        kind = "video" if buffer.is_video else "image"
+        try:
+            with metrics.timer("upload", kind=kind):
+                if buffer.is_video:
+                    media_type = mimetypes.guess_type(buffer.name)[0] or 'video/mp4'
+                    media_id = await self.chunked.upload(buffer, media_type, media_category='tweet_video', priority=priority)
+                elif self.call:
+                    media = await self.call(("media_upload",), priority, f"upload {buffer.name}", self._simple_upload, buffer)
+                    media_id = media.media_id
                 else:
-                    media = self.api.media_upload(path)
-                
-                media_ids.append(media.media_id)
-            except Exception as e:
-                logger.error(f"Media upload error ({path}): {e}")
-        return media_ids
\ No newline at end of file
+                    loop = asyncio.get_running_loop()
+                    media = await loop.run_in_executor(self.executor, self._simple_upload, buffer)
+                    media_id = media.media_id
+            metrics.inc("upload_bytes", buffer.size, kind=kind)
+            return media_id
+        except Exception as e:
+            logger.error(f"Media upload error ({buffer.name}): {e}")
+            return None
+
+    async def upload_media(self, buffers, priority=PRIORITY_POST):
+        results = await asyncio.gather(*(self.upload_file(buffer, priority) for buffer in buffers))
+        return [media_id for media_id in results if media_id]
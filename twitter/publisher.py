@@ -1,79 +1,190 @@
-import tweepy
+import asyncio
+import functools
 import time
+import requests
+import tweepy
+from concurrent.futures import ThreadPoolExecutor
 from core.logger import setup_logger
+from core.metrics import metrics
+from .chunked_uploader import ChunkedUploader
 from .media_uploader import MediaUploader
+from .worker import WorkerAccountConfig
+from .scheduler import PublishScheduler, TokenBucket, PRIORITY_DELETE, PRIORITY_POST
 from utils.formatter import TextFormatter
 
 logger = setup_logger()
 
+ENDPOINT_CREATE = ("tweet_create", "daily_posts")
+ENDPOINT_DELETE = ("tweet_delete",)
+ENDPOINT_MEDIA = ("media_upload",)
+BUCKET_WINDOWS = {"tweet_create": 15 * 60, "tweet_delete": 15 * 60, "media_upload": 15 * 60, "daily_posts": 24 * 3600}
+
 class TwitterPublisher:
     def __init__(self, config):
+        self._connect(config)
+        self.thread_delay = config.THREAD_DELAY
+        self.name = getattr(config, "ACCOUNT_NAME", "default")
+        self.scheduler = PublishScheduler([
+            TokenBucket(name, capacity, BUCKET_WINDOWS[name]) for name, capacity in self._limits(config).items()
+        ], share=config.share if isinstance(config, WorkerAccountConfig) else None)
+        # tweepy is blocking; every call goes through this bounded pool so the event loop stays free.
+        self.executor = ThreadPoolExecutor(max_workers=config.TW_WORKERS, thread_name_prefix="twitter")
+        chunked = ChunkedUploader(
+            self.api_v1, self.executor, config.UPLOAD_STATE_FILE,
+            parallel=config.UPLOAD_PARALLEL_SEGMENTS, call=self._call
+        )
+        self.uploader = MediaUploader(self.api_v1, self.executor, chunked, call=self._call)
+        metrics.register(self._gauges)
+
+    @staticmethod
+    def _limits(config):
+        return {
+            "tweet_create": config.TW_RATE_TWEET_CREATE,
+            "tweet_delete": config.TW_RATE_TWEET_DELETE,
+            "media_upload": config.TW_RATE_MEDIA_UPLOAD,
+            "daily_posts": config.TW_DAILY_TWEET_CAP,
+        }
+
+    def _connect(self, config):
+        # Rate limits are handled by the scheduler, never by sleeping inside tweepy.
         self.client = tweepy.Client(
             bearer_token=config.TW_BEARER_TOKEN,
             consumer_key=config.TW_API_KEY,
             consumer_secret=config.TW_API_SECRET,
             access_token=config.TW_ACCESS_TOKEN,
             access_token_secret=config.TW_ACCESS_SECRET,
-            wait_on_rate_limit=True
+            return_type=requests.Response,
+            wait_on_rate_limit=False
         )
         auth = tweepy.OAuth1UserHandler(
             config.TW_API_KEY, config.TW_API_SECRET,
             config.TW_ACCESS_TOKEN, config.TW_ACCESS_SECRET
         )
-        self.api_v1 = tweepy.API(auth, wait_on_rate_limit=True)
-        self.uploader = MediaUploader(self.api_v1)
+        self.api_v1 = tweepy.API(auth, wait_on_rate_limit=False)
+
+    def reconfigure(self, config):
+        """Applies new credentials and limits in place (/reload); queued calls keep their place."""
+        self._connect(config)
+        self.uploader.api = self.uploader.chunked.api = self.api_v1
+        self.thread_delay = config.THREAD_DELAY
+        for name, capacity in self._limits(config).items():
+            self.scheduler.buckets[name].resize(capacity)
+
+    def _gauges(self):
+        for name, (left, cap) in self.scheduler.headroom().items():
+            yield "rate_headroom", {"account": self.name, "bucket": name}, left
+            yield "rate_capacity", {"account": self.name, "bucket": name}, cap
+        yield "scheduler_waiting", {"account": self.name}, len(self.scheduler.waiters)
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
 
-    def post_tweet(self, text, media_paths=None, quote_id=None):
-        media_ids = []
-        if media_paths:
-            media_ids = self.uploader.upload_media(media_paths)
+    def _observe(self, endpoints, headers, limited=False):
+        self.scheduler.observe(endpoints[0], headers, limited=limited)
+        if endpoints is ENDPOINT_CREATE:
+            self.scheduler.observe("daily_posts", headers, prefix="x-user-limit-24hour")
+
+    async def _call(self, endpoints, priority, label, func, *args, **kwargs):
+        """Runs a blocking tweepy call once the scheduler grants a slot; a 429 re-queues it."""
+        for attempt in range(3):
+            queued = time.perf_counter()
+            await self.scheduler.acquire(endpoints, priority, label)
+            metrics.observe("scheduler_wait", time.perf_counter() - queued, account=self.name, endpoint=endpoints[0])
+            try:
+                with metrics.timer("twitter_call", account=self.name, endpoint=endpoints[0]):
+                    result = await self._run(func, *args, **kwargs)
+            except tweepy.TooManyRequests as e:
+                logger.warning(f"429 on {label}, re-queued.")
+                metrics.inc("rate_limited", account=self.name, endpoint=endpoints[0])
+                self._observe(endpoints, e.response.headers, limited=True)
+                if attempt == 2: raise
+                continue
+            if isinstance(result, requests.Response):
+                headers = result.headers
+            else:
+                last = getattr(self.api_v1, 'last_response', None)
+                headers = last.headers if last is not None else None
+            self._observe(endpoints, headers)
+            return result
+
+    async def _create_tweet(self, priority, **kwargs):
+        with metrics.timer("tweet_create"):
+            response = await self._call(ENDPOINT_CREATE, priority, "create tweet", self.client.create_tweet, **kwargs)
+        return response.json()['data']['id']
+
+    async def post_tweet(self, text, media_ids=None, quote_id=None, priority=PRIORITY_POST,
+                         posted_ids=None, on_posted=None):
+        """
+        Posts text (split into a thread when needed) with media on the first part.
+        `posted_ids` are parts already created by an earlier attempt; posting resumes after them.
+        `on_posted` is called with the list of created ids after every part.
+        """
+        media_ids = list(media_ids or [])
+        posted_ids = list(posted_ids or [])
 
         threads = TextFormatter.split_into_threads(text)
-        if not threads and media_ids: threads = [""]
+        if not threads and (media_ids or posted_ids): threads = [""]
         if not threads and not media_ids: return None
 
         try:
-            first_tweet_id = None
-            previous_tweet_id = None
             for idx, part in enumerate(threads):
+                if idx < len(posted_ids):
+                    continue
                 current_media = media_ids if idx == 0 else None
                 current_quote_id = quote_id if idx == 0 else None
 
-                if previous_tweet_id:
-                    response = self.client.create_tweet(
+                if posted_ids:
+                    await asyncio.sleep(self.thread_delay)
+                    tweet_id = await self._create_tweet(
+                        priority,
                         text=part,
-                        in_reply_to_tweet_id=previous_tweet_id
+                        in_reply_to_tweet_id=posted_ids[-1]
                     )
                 else:
                     if current_media:
-                        response = self.client.create_tweet(
+                        tweet_id = await self._create_tweet(
+                            priority,
                             text=part,
                             media_ids=current_media,
                             quote_tweet_id=current_quote_id
                         )
                     else:
-                        response = self.client.create_tweet(
+                        tweet_id = await self._create_tweet(
+                            priority,
                             text=part,
                             quote_tweet_id=current_quote_id
                         )
-                previous_tweet_id = response.data['id']
-                if first_tweet_id is None:
-                    first_tweet_id = previous_tweet_id
-                time.sleep(2)
-            logger.info(f"Tweet posted! ID: {first_tweet_id}")
-            return first_tweet_id
+                posted_ids.append(tweet_id)
+                if on_posted: on_posted(list(posted_ids))
+            logger.info(f"Tweet posted! ID: {posted_ids[0]}")
+            return posted_ids[0]
         except Exception as e:
             logger.error(f"Twitter API Error: {e}")
             return None
 
-    def delete_tweet(self, tweet_id):
+    async def delete_tweet(self, tweet_id, priority=PRIORITY_DELETE):
         """
         Deletes a tweet by ID using API v2.
         """
         try:
-            self.client.delete_tweet(tweet_id)
+            with metrics.timer("tweet_delete"):
+                await self._call(ENDPOINT_DELETE, priority, f"delete {tweet_id}", self.client.delete_tweet, tweet_id)
             logger.info(f"Tweet deleted successfully: {tweet_id}")
             return True
+        except tweepy.NotFound:
+            logger.info(f"Tweet {tweet_id} was already gone.")
+            return True
         except Exception as e:
             logger.error(f"Failed to delete tweet {tweet_id}: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    async def delete_tweets(self, tweet_ids, priority=PRIORITY_DELETE):
+        """
+        Deletes several tweets concurrently; the scheduler keeps them within the delete budget.
+        Thread replies are queued ahead of their root.
+        Returns {tweet_id: deleted}.
+        """
+        tweet_ids = list(dict.fromkeys(str(t) for t in tweet_ids))[::-1]
+        results = await asyncio.gather(*(self.delete_tweet(t, priority) for t in tweet_ids))
+        return dict(zip(tweet_ids, results))
@@ -0,0 +1,196 @@
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from core.logger import setup_logger
+from utils.publish_queue import PublishQueue
+from .scheduler import PRIORITY_DELETE, PRIORITY_POST
+from .worker import run_publisher_worker
+
+logger = setup_logger()
+
+class RemoteScheduler:
+    """Rate budget and queued calls of an account, as reported by the publisher processes."""
+    def __init__(self, queue, account):
+        self.queue = queue
+        self.account = account
+
+    def headroom(self):
+        """
+        The account-wide remaining budget last reported by Twitter (newest report across the
+        processes); buckets without a report yet show the sum of the processes' shares.
+        """
+        total, reported = {}, {}
+        for headroom, _ in self.queue.worker_status(self.account):
+            for bucket, (left, cap, report) in headroom.items():
+                prev_left, prev_cap = total.get(bucket, (0, 0))
+                total[bucket] = (prev_left + left, prev_cap + cap)
+                if report and (bucket not in reported or report[3] > reported[bucket][3]):
+                    reported[bucket] = report
+        for bucket, (remaining, limit, _, _) in reported.items():
+            total[bucket] = (remaining, limit)
+        return total
+
+    def projected_waits(self):
+        waits = [tuple(w) for _, waiting in self.queue.worker_status(self.account) for w in waiting]
+        return sorted(waits, key=lambda w: w[3])
+
+class RemotePublisher:
+    """
+    Stands in for TwitterPublisher in the ingest process: the same calls, executed by
+    the publisher processes. Results (and thread progress) are polled back from the
+    PublishQueue, so storage stays with the ingest process.
+    """
+    def __init__(self, queue, name, temp_dir, poll_interval=0.01):
+        self.queue = queue
+        self.name = name
+        self.temp_dir = temp_dir
+        self.poll_interval = poll_interval
+        self.uploader = self
+        self.scheduler = RemoteScheduler(queue, name)
+        self.waiting = {}
+        self.collector = None
+
+    async def _submit(self, kind, payload, priority, on_progress=None):
+        task_id = self.queue.submit(self.name, kind, payload, priority)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[task_id] = [future, on_progress, None]
+        if self.collector is None or self.collector.done():
+            self.collector = asyncio.create_task(self._collect())
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self.queue.cancel(task_id)
+            raise
+        finally:
+            self.waiting.pop(task_id, None)
+
+    async def _collect(self):
+        while self.waiting:
+            await asyncio.sleep(self.poll_interval)
+            finished = []
+            for task_id, state, progress, result in self.queue.poll(list(self.waiting)):
+                entry = self.waiting.get(task_id)
+                if not entry: continue
+                future, on_progress, seen = entry
+                if progress and progress != seen:
+                    entry[2] = progress
+                    if on_progress: on_progress(progress)
+                if state in ("done", "error"):
+                    finished.append(task_id)
+                    if not future.done():
+                        future.set_result(result if state == "done" else None)
+            if finished:
+                self.queue.remove(finished)
+
+    def _spool(self, buffer):
+        """Path the publisher process can read the buffer from (anonymous buffers are copied to temp_dir)."""
+        path = getattr(buffer.file, 'name', None)
+        if isinstance(path, str) and os.path.exists(path):
+            return path, False
+        fd, path = tempfile.mkstemp(dir=self.temp_dir, suffix=os.path.splitext(buffer.name)[1])
+        with buffer.lock, os.fdopen(fd, 'wb') as f:
+            buffer.file.seek(0)
+            shutil.copyfileobj(buffer.file, f)
+        return path, True
+
+    async def upload_file(self, buffer, priority=PRIORITY_POST):
+        path, temporary = await asyncio.to_thread(self._spool, buffer)
+        try:
+            result = await self._submit("upload", {"path": path, "name": buffer.name}, priority)
+        finally:
+            if temporary:
+                os.remove(path)
+        return result["media_id"] if result else None
+
+    async def upload_media(self, buffers, priority=PRIORITY_POST):
+        results = await asyncio.gather(*(self.upload_file(buffer, priority) for buffer in buffers))
+        return [media_id for media_id in results if media_id]
+
+    async def post_tweet(self, text, media_ids=None, quote_id=None, priority=PRIORITY_POST,
+                         posted_ids=None, on_posted=None):
+        payload = {
+            "text": text, "media_ids": list(media_ids or []), "quote_id": quote_id,
+            "posted_ids": list(posted_ids or []),
+        }
+        result = await self._submit("post", payload, priority, on_progress=on_posted)
+        return result["tweet_id"] if result else None
+
+    async def delete_tweets(self, tweet_ids, priority=PRIORITY_DELETE):
+        tweet_ids = [str(t) for t in tweet_ids]
+        result = await self._submit("delete", {"tweet_ids": tweet_ids}, priority)
+        if not result:
+            return {t: False for t in tweet_ids}
+        return result["deleted"]
+
+    async def delete_tweet(self, tweet_id, priority=PRIORITY_DELETE):
+        return (await self.delete_tweets([tweet_id], priority)).get(str(tweet_id), False)
+
+class PublisherPool:
+    """Spawns the publisher processes and restarts any that die."""
+    def __init__(self, workers, db_path, setup=None):
+        self.workers = workers
+        self.db_path = db_path
+        self.setup = setup
+        self.context = multiprocessing.get_context("spawn")
+        self.processes = {}
+        self.restarting = False
+
+    def _spawn(self, index):
+        process = self.context.Process(
+            target=run_publisher_worker, args=(index, self.workers, self.db_path, self.setup),
+            name=f"publisher-{index}", daemon=True
+        )
+        process.start()
+        self.processes[index] = process
+
+    def start(self):
+        for index in range(self.workers):
+            self._spawn(index)
+        logger.info(f"Started {self.workers} publisher process(es).")
+
+    async def watch(self, queue, interval=5):
+        while True:
+            await asyncio.sleep(interval)
+            if self.restarting: continue
+            for index, process in list(self.processes.items()):
+                if process.is_alive(): continue
+                recovered = queue.recover(index)
+                logger.error(f"Publisher process {index} exited ({process.exitcode}); restarting, {recovered} task(s) re-queued.")
+                self._spawn(index)
+
+    def restart(self, timeout=30):
+        """
+        Replaces every publisher process (e.g. after /reload). Each one finishes the calls it
+        is running before it exits; only a process still busy after `timeout` seconds is
+        killed and its calls re-queued. Blocks, so run it in a thread.
+        """
+        self.restarting = True
+        queue = PublishQueue(self.db_path)
+        try:
+            old = list(self.processes.items())
+            for _, process in old:
+                process.terminate()
+            deadline = time.monotonic() + timeout
+            for index, process in old:
+                process.join(max(0.0, deadline - time.monotonic()))
+                if process.is_alive():
+                    logger.warning(f"Publisher process {index} still busy after {timeout:.0f}s; killing it.")
+                    process.kill()
+                    process.join()
+                queue.recover(index)
+                self._spawn(index)
+        finally:
+            queue.close()
+            self.restarting = False
+
+    def stop(self, timeout=5):
+        for process in self.processes.values():
+            process.terminate()
+        for process in self.processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+        self.processes.clear()
@@ -0,0 +1,180 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from core.logger import setup_logger
+
+logger = setup_logger()
+
+PRIORITY_DELETE = 0
+PRIORITY_POST = 1
+PRIORITY_EDIT = 2
+
+PRIORITY_NAMES = {PRIORITY_DELETE: "delete", PRIORITY_POST: "post", PRIORITY_EDIT: "edit"}
+
+class TokenBucket:
+    """
+    Request budget of one endpoint. Refills continuously at capacity/window until the
+    API reports its real state through x-rate-limit-* headers; from then on the reported
+    remaining count is used until the reported reset time.
+    """
+    def __init__(self, name, capacity, window):
+        self.name = name
+        self.capacity = capacity
+        self.window = window
+        self.tokens = float(capacity)
+        self.reset_at = None
+        self.updated = time.time()
+        # Account-wide (remaining, limit, reset_at, observed_at) from the last response headers.
+        self.reported = None
+
+    def available(self, now):
+        """Tokens at `now`, without changing the bucket (metrics read it from another thread)."""
+        if self.reset_at is not None:
+            return float(self.capacity) if now >= self.reset_at else self.tokens
+        return min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.window)
+
+    def refill(self, now):
+        self.tokens = self.available(now)
+        if self.reset_at is not None and now >= self.reset_at:
+            self.reset_at = None
+        self.updated = now
+
+    def wait_time(self, now, needed=1):
+        """Seconds until `needed` tokens are available."""
+        self.refill(now)
+        if self.tokens >= needed:
+            return 0.0
+        deficit = needed - self.tokens
+        if self.reset_at is not None:
+            windows = math.ceil(deficit / max(self.capacity, 1))
+            return (self.reset_at - now) + (windows - 1) * self.window
+        return deficit * self.window / max(self.capacity, 1)
+
+    def take(self):
+        self.tokens -= 1
+
+    def resize(self, capacity):
+        """New configured capacity (/reload); tokens above it are dropped."""
+        self.capacity = capacity
+        self.tokens = min(self.tokens, float(capacity))
+
+    def update(self, limit=None, remaining=None, reset=None):
+        if limit is not None: self.capacity = limit
+        if remaining is not None: self.tokens = float(remaining)
+        if reset is not None: self.reset_at = float(reset)
+
+class PublishScheduler:
+    """
+    Orders Twitter calls by priority (deletions, then new posts, then edits) and only
+    lets a call through when every bucket it needs has a token. A blocked high-priority
+    call keeps lower-priority calls off the same bucket, but not off other buckets.
+    `share(value, minimum)` scales the account-wide header values down to this process's
+    part of the budget (publisher processes).
+    """
+    def __init__(self, buckets, share=None):
+        self.buckets = {b.name: b for b in buckets}
+        self.share = share
+        self.waiters = []
+        self.counter = itertools.count()
+        self.wakeup = None
+        self.dispatcher = None
+
+    async def acquire(self, endpoints, priority, label=""):
+        loop = asyncio.get_running_loop()
+        if self.wakeup is None:
+            self.wakeup = asyncio.Event()
+        if self.dispatcher is None or self.dispatcher.done():
+            self.dispatcher = asyncio.create_task(self._dispatch())
+
+        future = loop.create_future()
+        heapq.heappush(self.waiters, (priority, next(self.counter), tuple(endpoints), label, time.time(), future))
+        self.wakeup.set()
+        try:
+            await future
+        except asyncio.CancelledError:
+            self.waiters = [w for w in self.waiters if w[-1] is not future]
+            heapq.heapify(self.waiters)
+            raise
+
+    async def _dispatch(self):
+        while True:
+            now = time.time()
+            blocked = set()
+            granted = []
+            next_check = None
+            for waiter in sorted(self.waiters):
+                endpoints = waiter[2]
+                if blocked.intersection(endpoints):
+                    continue
+                waits = [self.buckets[e].wait_time(now) for e in endpoints]
+                if max(waits) <= 0:
+                    for e in endpoints: self.buckets[e].take()
+                    granted.append(waiter)
+                else:
+                    blocked.update(endpoints)
+                    wait = max(waits)
+                    next_check = wait if next_check is None else min(next_check, wait)
+
+            for waiter in granted:
+                self.waiters.remove(waiter)
+                if not waiter[-1].done(): waiter[-1].set_result(None)
+            heapq.heapify(self.waiters)
+
+            self.wakeup.clear()
+            if next_check is not None:
+                logger.warning(f"Rate limit: {len(self.waiters)} job(s) waiting, next slot in {next_check:.0f}s")
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=next_check)
+            except asyncio.TimeoutError:
+                pass
+
+    def observe(self, endpoint, headers, limited=False, prefix='x-rate-limit'):
+        """Feeds <prefix>-limit/-remaining/-reset response headers (and 429s) back into the bucket."""
+        bucket = self.buckets.get(endpoint)
+        if bucket is None: return
+        headers = headers or {}
+
+        def header(name):
+            value = headers.get(f"{prefix}-{name}")
+            return int(value) if value is not None else None
+
+        limit, remaining, reset = header('limit'), header('remaining'), header('reset')
+        if remaining is not None:
+            bucket.reported = (remaining, limit if limit is not None else bucket.capacity, reset, time.time())
+        if self.share:
+            limit = self.share(limit) if limit is not None else None
+            remaining = self.share(remaining, 0) if remaining is not None else None
+        bucket.update(limit, remaining, reset)
+        if limited:
+            bucket.tokens = 0.0
+            if bucket.reset_at is None:
+                bucket.reset_at = time.time() + bucket.window
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    def projected_waits(self):
+        """(label, priority name, seconds queued, projected wait) for every queued job, in dispatch order."""
+        now = time.time()
+        ahead = {}
+        result = []
+        for priority, _, endpoints, label, enqueued, _ in sorted(self.waiters):
+            wait = 0.0
+            for e in endpoints:
+                ahead[e] = ahead.get(e, 0) + 1
+                wait = max(wait, self.buckets[e].wait_time(now, ahead[e]))
+            result.append((label, PRIORITY_NAMES.get(priority, str(priority)), now - enqueued, wait))
+        return result
+
+    def headroom(self):
+        now = time.time()
+        return {name: (int(b.available(now)), b.capacity) for name, b in self.buckets.items()}
+
+    def reported(self):
+        """Account-wide {bucket: (remaining, limit, reset_at, observed_at)} still within their window."""
+        now = time.time()
+        return {
+            name: b.reported for name, b in self.buckets.items()
+            if b.reported and (b.reported[2] is None or b.reported[2] > now)
+        }
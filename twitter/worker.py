@@ -0,0 +1,127 @@
+"""
+Publisher process (PUBLISH_WORKERS > 0): claims Twitter calls from the PublishQueue
+and runs them with its own TwitterPublisher per account.
+"""
+import asyncio
+import os
+import signal
+import time
+
+# Budgets divided between the publisher processes so that together they stay within the account limits.
+SHARED_LIMITS = ("TW_RATE_TWEET_CREATE", "TW_RATE_TWEET_DELETE", "TW_RATE_MEDIA_UPLOAD", "TW_DAILY_TWEET_CAP")
+
+class WorkerAccountConfig:
+    """An account's config as seen by one of `workers` publisher processes."""
+    def __init__(self, config, index, workers):
+        self.config = config
+        self.index = index
+        self.workers = workers
+        base, ext = os.path.splitext(config.UPLOAD_STATE_FILE)
+        self.UPLOAD_STATE_FILE = f"{base}.{index}{ext}"
+
+    def __getattr__(self, item):
+        value = getattr(self.config, item)
+        if item in SHARED_LIMITS:
+            return self.share(value)
+        return value
+
+    def share(self, value, minimum=1):
+        """This process's part of an account-wide budget (also used for x-rate-limit headers)."""
+        return max(minimum, value // self.workers + (1 if self.index < value % self.workers else 0))
+
+def build_publishers(index, workers):
+    from core.routing import load_routes
+    from twitter.publisher import TwitterPublisher
+    accounts, _ = load_routes()
+    return {name: TwitterPublisher(WorkerAccountConfig(config, index, workers)) for name, config in accounts.items()}
+
+async def handle_task(queue, publisher, task):
+    from utils.media_buffer import MediaBuffer
+    payload, priority = task["payload"], task["priority"]
+    if task["kind"] == "upload":
+        buffer = MediaBuffer(payload["name"], open(payload["path"], 'rb'))
+        try:
+            return {"media_id": await publisher.uploader.upload_file(buffer, priority)}
+        finally:
+            buffer.close()
+    if task["kind"] == "post":
+        tweet_id = await publisher.post_tweet(
+            payload["text"], media_ids=payload["media_ids"], quote_id=payload["quote_id"], priority=priority,
+            posted_ids=task["progress"] or payload["posted_ids"],
+            on_posted=lambda ids: queue.report_progress(task["id"], ids)
+        )
+        return {"tweet_id": tweet_id}
+    if task["kind"] == "delete":
+        return {"deleted": await publisher.delete_tweets(payload["tweet_ids"], priority)}
+    raise ValueError(f"Unknown publish task kind: {task['kind']}")
+
+async def serve(queue, publishers, index, concurrency, heartbeat_interval=2):
+    """
+    Runs up to `concurrency` tasks at once until the parent process goes away. SIGTERM
+    stops claiming new tasks and exits once the running ones have finished, so a call
+    that already reached Twitter is never handed to another process.
+    """
+    from core.logger import setup_logger
+    logger = setup_logger()
+    parent = os.getppid()
+    running = set()
+    idle = 0.005
+    last_heartbeat = 0.0
+    stopping = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+
+    async def run(task):
+        try:
+            queue.finish(task["id"], await handle_task(queue, publishers[task["account"]], task))
+        except Exception as e:
+            logger.error(f"Publish task {task['id']} ({task['kind']}) failed: {e}")
+            queue.finish(task["id"], {"error": str(e)}, state="error")
+
+    logger.info(f"Publisher process {index} ready (pid {os.getpid()}, accounts: {', '.join(publishers)}).")
+    while os.getppid() == parent and not stopping.is_set():
+        if time.monotonic() - last_heartbeat >= heartbeat_interval:
+            last_heartbeat = time.monotonic()
+            for name, publisher in publishers.items():
+                waiting = [list(w) for w in publisher.scheduler.projected_waits()]
+                reported = publisher.scheduler.reported()
+                headroom = {
+                    bucket: [left, cap, reported.get(bucket)]
+                    for bucket, (left, cap) in publisher.scheduler.headroom().items()
+                }
+                queue.heartbeat(index, name, headroom, waiting)
+
+        if len(running) >= concurrency:
+            await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            continue
+        task = queue.claim(index)
+        if not task:
+            await asyncio.sleep(idle)
+            idle = min(idle * 2, 0.1)
+            continue
+        idle = 0.005
+        future = asyncio.create_task(run(task))
+        running.add(future)
+        future.add_done_callback(running.discard)
+    if stopping.is_set():
+        logger.info(f"Publisher process {index}: stopping after {len(running)} running task(s).")
+        while running and os.getppid() == parent:
+            await asyncio.wait(running, timeout=1)
+        return
+    logger.warning(f"Publisher process {index}: parent exited, stopping.")
+
+def run_publisher_worker(index, workers, db_path, setup=None):
+    """Process entry point. `setup(publishers)` lets benchmarks re-route the HTTP sessions."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from core.env_loader import Config
+    from core.logger import enable_file_logging
+    from core.metrics import start_metrics_server
+    from utils.publish_queue import PublishQueue
+
+    Config.load()
+    enable_file_logging(os.path.join("logs", f"publisher-{index}.log"))
+    publishers = build_publishers(index, workers)
+    if setup:
+        setup(publishers)
+    if Config.METRICS_PORT:
+        start_metrics_server(Config.METRICS_PORT + 1 + index, Config.METRICS_HOST)
+    asyncio.run(serve(PublishQueue(db_path), publishers, index, Config.TW_WORKERS * 2))
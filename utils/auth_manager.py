@@ -36,6 +36,11 @@ class AuthManager:
         except Exception as e:
             logger.error(f"Failed to save sudoers: {e}")
 
+    def reload(self):
+        """Re-reads the owner from Config and the sudo list from disk."""
+        self.owner_id = Config.ADMIN_ID
+        self.sudoers = self._load_sudoers()
+
     def is_owner(self, user_id):
         """Is the user the owner?"""
         return user_id == self.owner_id
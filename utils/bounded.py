@@ -0,0 +1,58 @@
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+class BoundedDict(MutableMapping):
+    """
+    Dict capped by entry count and (optionally) age. Writing a key refreshes it;
+    the oldest entries are evicted first. `on_evict(key, value)` is called for
+    entries dropped by the cap or the TTL, not for explicit deletes.
+    """
+    def __init__(self, max_size, ttl=None, on_evict=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.evictions = 0
+        self._data = OrderedDict()
+
+    def _expire(self):
+        if self.ttl is None:
+            return
+        cutoff = time.monotonic() - self.ttl
+        while self._data:
+            key, (stamp, value) = next(iter(self._data.items()))
+            if stamp > cutoff:
+                break
+            self._evict(key)
+
+    def _evict(self, key):
+        _, value = self._data.pop(key)
+        self.evictions += 1
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def __setitem__(self, key, value):
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic(), value)
+        self._expire()
+        while len(self._data) > self.max_size:
+            self._evict(next(iter(self._data)))
+
+    def __getitem__(self, key):
+        self._expire()
+        return self._data[key][1]
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __iter__(self):
+        self._expire()
+        return iter(list(self._data))
+
+    def __len__(self):
+        self._expire()
+        return len(self._data)
+
+    def size(self):
+        """Entry count without expiring anything, so other threads (metrics) can read it."""
+        return len(self._data)
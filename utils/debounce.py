@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+class Debouncer:
+    """
+    Idle timer for a burst of related events (the items of an album, repeated edits of
+    a message). wait() returns once `quiet` seconds pass without add(), `max_wait`
+    seconds after the first add(), or as soon as `limit` items are in.
+    """
+    def __init__(self, quiet, max_wait, limit=None):
+        self.quiet = quiet
+        self.max_wait = max_wait
+        self.limit = limit
+        self.items = []
+        self.started = self.last = time.monotonic()
+        self.reason = None
+        self._closed = asyncio.Event()
+
+    def add(self, item):
+        """Adds an item and restarts the quiet period. Returns the gap since the previous item (None for the first)."""
+        now = time.monotonic()
+        gap = now - self.last if self.items else None
+        self.last = now
+        self.items.append(item)
+        if self.limit and len(self.items) >= self.limit:
+            self._close("full")
+        return gap
+
+    def flush(self):
+        """Ends the wait now (e.g. the entry was evicted); the items are still processed."""
+        self._close("flushed")
+
+    def cancel(self):
+        """Also overrides an earlier reason, so code still acting on it (e.g. a deferred edit) stops."""
+        self.reason = "cancelled"
+        self._closed.set()
+
+    def _close(self, reason):
+        if self.reason is None:
+            self.reason = reason
+        self._closed.set()
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    async def wait(self):
+        """Returns why the burst ended: 'quiet', 'max_wait', 'full', 'flushed' or 'cancelled'."""
+        while self.reason is None:
+            remaining = min(self.last + self.quiet, self.started + self.max_wait) - time.monotonic()
+            if remaining <= 0:
+                self.reason = "max_wait" if self.elapsed() >= self.max_wait else "quiet"
+                break
+            try:
+                await asyncio.wait_for(self._closed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        return self.reason
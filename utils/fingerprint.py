@@ -0,0 +1,18 @@
+import hashlib
+import json
+from utils.media_cache import MediaCache
+
+def content_fingerprint(messages):
+    """
+    Hash of what actually ends up on Twitter for a post (single message or album):
+    whitespace-normalized text, the media identity list and the reply target.
+    Edits that only touch reactions, buttons or formatting produce the same value.
+    """
+    messages = sorted(messages, key=lambda m: m.id)
+    text = next((m.raw_text for m in messages if m.raw_text), "") or ""
+    payload = {
+        "text": " ".join(text.split()),
+        "media": [MediaCache.key_for(m) for m in messages if m.media],
+        "reply_to": messages[0].reply_to_msg_id if messages[0].is_reply else None,
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
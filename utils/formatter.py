@@ -1,15 +1,139 @@
+import re
+
+MAX_TWEET_WEIGHT = 280
+URL_WEIGHT = 23
+EMOJI_WEIGHT = 2
+
+TOKEN_RE = re.compile(
+    r"(?P<space>\s+)"
+    r"|(?P<url>(?:https?://|www\.)\S+?)(?=[.,!?;:)\]'\"]*(?:\s|$))"
+    r"|(?P<text>(?:(?!https?://)\S)+)"
+)
+EMOJI_RE = re.compile(
+    "(?:[\U0001F1E6-\U0001F1FF]{2}"
+    "|[☀-➿\U0001F000-\U0001FAFF]"
+    "[️\U0001F3FB-\U0001F3FF]?"
+    "(?:‍[☀-➿\U0001F000-\U0001FAFF][️\U0001F3FB-\U0001F3FF]?)*)"
+)
+SENTENCE_END = ('.', '!', '?', '…', '."', '!"', '?"', '.)', '!)', '?)')
+
+HEAVY_RE = re.compile("[^\u0000-\u10ff\u2000-\u200d\u2010-\u201f\u2032-\u2037]")
+
+def _char_weight(ch):
+    return 2 if HEAVY_RE.match(ch) else 1
+
+def _text_weight(text):
+    """Twitter weighted length of plain text: CJK and most non-Latin count 2, an emoji sequence counts 2."""
+    if text.isascii():
+        return len(text)
+    weight = len(text) + len(HEAVY_RE.findall(text))
+    for match in EMOJI_RE.finditer(text):
+        sequence = match.group()
+        weight += EMOJI_WEIGHT - len(sequence) - len(HEAVY_RE.findall(sequence))
+    return weight
+
+class _Token:
+    __slots__ = ("text", "kind", "weight")
+
+    def __init__(self, text, kind, weight):
+        self.text = text
+        self.kind = kind
+        self.weight = weight
+
+def _tokenize(text):
+    tokens = []
+    for match in TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        value = match.group()
+        if kind == "space":
+            tokens.append(_Token(value, "para" if value.count("\n") >= 2 else "space", _text_weight(value)))
+        elif kind == "url":
+            tokens.append(_Token(value, "url", URL_WEIGHT))
+        else:
+            tokens.append(_Token(value, "text", _text_weight(value)))
+    return tokens
+
+def _hard_split(token, budget):
+    """Cuts a single oversized word so that the head fits `budget`."""
+    weight = 0
+    for idx, ch in enumerate(token.text):
+        weight += _char_weight(ch)
+        if weight > budget:
+            head, tail = token.text[:idx], token.text[idx:]
+            return head, _Token(tail, "text", _text_weight(tail))
+    return token.text, None
+
+def _split(tokens, budget):
+    parts = []
+    start, count = 0, len(tokens)
+    while True:
+        while start < count and tokens[start].kind in ("space", "para"):
+            start += 1
+        if start >= count:
+            return parts
+
+        weight, i = 0, start
+        para = sentence = word = None
+        while i < count and weight + tokens[i].weight <= budget:
+            token = tokens[i]
+            if token.kind in ("space", "para") and i > start:
+                word = (i, weight)
+                if token.kind == "para":
+                    para = (i, weight)
+                if tokens[i - 1].text.endswith(SENTENCE_END):
+                    sentence = (i, weight)
+            weight += token.weight
+            i += 1
+
+        if i >= count:
+            parts.append("".join(t.text for t in tokens[start:count]).strip())
+            return parts
+
+        if tokens[i].kind in ("space", "para"):
+            cut = i
+        else:
+            cut = None
+            for candidate in (para, sentence):
+                if candidate and candidate[1] >= budget // 2:
+                    cut = candidate[0]
+                    break
+            if cut is None and word:
+                cut = word[0]
+            elif cut is None and tokens[i].kind == "url":
+                # A URL glued to the word before it: end the part there, the URL moves on whole.
+                cut = i
+
+        if cut is None:
+            head, tail = _hard_split(tokens[i], budget - weight)
+            parts.append(("".join(t.text for t in tokens[start:i]) + head).strip())
+            tokens[i] = tail
+            start = i
+        else:
+            parts.append("".join(t.text for t in tokens[start:cut]).strip())
+            start = cut
+
 class TextFormatter:
     @staticmethod
-    def split_into_threads(text, limit=270):
+    def weighted_length(text):
+        """Length of `text` as counted by Twitter (weighted characters, URLs = 23)."""
+        return sum(token.weight for token in _tokenize(text))
+
+    @staticmethod
+    def split_into_threads(text, limit=MAX_TWEET_WEIGHT):
+        """
+        Splits text into tweets of at most `limit` weighted characters, numbered " (i/n)".
+        Prefers paragraph, then sentence, then word boundaries; URLs, mentions and
+        hashtags are never cut. The numbering suffix is part of the budget.
+        """
         if not text: return []
-        if len(text) <= limit: return [text]
-
-        threads = []
-        while len(text) > limit:
-            split_index = text.rfind(' ', 0, limit)
-            if split_index == -1: split_index = limit
-            threads.append(text[:split_index])
-            text = text[split_index:].strip()
-        
-        if text: threads.append(text)
-        return [f"{t} ({i+1}/{len(threads)})" for i, t in enumerate(threads)]
\ No newline at end of file
+        tokens = _tokenize(text)
+        if sum(t.weight for t in tokens) <= limit: return [text]
+
+        digits = 1
+        while True:
+            suffix_weight = len(" (/)") + 2 * digits
+            threads = _split(list(tokens), limit - suffix_weight)
+            if len(threads) < 10 ** digits:
+                break
+            digits += 1
+        return [f"{t} ({i+1}/{len(threads)})" for i, t in enumerate(threads)]
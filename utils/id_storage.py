@@ -1,47 +1,166 @@
 import json
 import os
+import sqlite3
 from core.logger import setup_logger
 
 logger = setup_logger()
 
 class IDStorage:
-    def __init__(self, filepath):
+    """
+    Telegram message id -> tweet id mapping store.
+    Backed by SQLite in WAL mode so every write is a small transaction instead of a full file rewrite.
+    """
+    def __init__(self, filepath, legacy_file=None):
         self.filepath = filepath
-        self.posted_data = self._load_data()
+        self.conn = sqlite3.connect(filepath, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        if legacy_file:
+            self._migrate_json(legacy_file)
 
-    def _load_data(self):
-        if not os.path.exists(self.filepath):
-            return {}
+    def _create_schema(self):
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS mappings ("
+            " tg_message_id INTEGER PRIMARY KEY,"
+            " tweet_id TEXT NOT NULL,"
+            " fingerprint TEXT)"
+        )
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(mappings)")]
+        if "fingerprint" not in columns:
+            self.conn.execute("ALTER TABLE mappings ADD COLUMN fingerprint TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_mappings_tweet ON mappings (tweet_id)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS threads ("
+            " root_tweet_id TEXT NOT NULL,"
+            " position INTEGER NOT NULL,"
+            " tweet_id TEXT NOT NULL,"
+            " PRIMARY KEY (root_tweet_id, position))"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+
+    def _migrate_json(self, legacy_file):
+        """One-time import of the old posted_ids.json file. The file is renamed afterwards."""
+        if not os.path.exists(legacy_file):
+            return
         try:
-            with open(self.filepath, 'r', encoding='utf-8') as f:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                if isinstance(data, list): return {}
-                return data
-        except json.JSONDecodeError:
-            return {}
+            if isinstance(data, dict):
+                self.add_ids(data.items())
+            os.replace(legacy_file, legacy_file + ".migrated")
+            logger.info(f"Migrated {len(data) if isinstance(data, dict) else 0} IDs from {legacy_file}")
+        except Exception as e:
+            logger.error(f"Failed to migrate ID data: {e}")
 
     def get_tweet_id(self, tg_message_id):
         """Retrieves the Twitter ID associated with a Telegram Message ID."""
-        return self.posted_data.get(str(tg_message_id))
+        row = self.conn.execute(
+            "SELECT tweet_id FROM mappings WHERE tg_message_id = ?", (int(tg_message_id),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_message_ids(self, tweet_id):
+        """All Telegram Message IDs mirrored into the given tweet (album items share one tweet)."""
+        rows = self.conn.execute(
+            "SELECT tg_message_id FROM mappings WHERE tweet_id = ? ORDER BY tg_message_id", (str(tweet_id),)
+        ).fetchall()
+        return [r[0] for r in rows]
 
     def is_posted(self, tg_message_id):
-        return str(tg_message_id) in self.posted_data
+        return self.get_tweet_id(tg_message_id) is not None
+
+    def get_fingerprint(self, tg_message_id):
+        """Content fingerprint stored with the mapping (see utils.fingerprint)."""
+        row = self.conn.execute(
+            "SELECT fingerprint FROM mappings WHERE tg_message_id = ?", (int(tg_message_id),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def add_id(self, tg_message_id, twitter_tweet_id, fingerprint=None):
+        self.add_ids([(tg_message_id, twitter_tweet_id)], fingerprint=fingerprint)
+
+    def add_ids(self, pairs, fingerprint=None, thread_ids=None):
+        """
+        Stores several (message id, tweet id) pairs in a single transaction.
+        `thread_ids` (root first) records the replies of a split post so they can be deleted with it.
+        """
+        rows = [(int(mid), str(tid), fingerprint) for mid, tid in pairs]
+        try:
+            with self.conn:
+                self.conn.execute("BEGIN")
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO mappings (tg_message_id, tweet_id, fingerprint) VALUES (?, ?, ?)", rows
+                )
+                if thread_ids and len(thread_ids) > 1:
+                    root = str(thread_ids[0])
+                    self.conn.execute("DELETE FROM threads WHERE root_tweet_id = ?", (root,))
+                    self.conn.executemany(
+                        "INSERT INTO threads (root_tweet_id, position, tweet_id) VALUES (?, ?, ?)",
+                        [(root, pos, str(tid)) for pos, tid in enumerate(thread_ids)]
+                    )
+        except Exception as e:
+            logger.error(f"Failed to save ID data: {e}")
+
+    def get_thread(self, root_tweet_id):
+        """Every tweet of the post rooted at root_tweet_id, root first."""
+        rows = self.conn.execute(
+            "SELECT tweet_id FROM threads WHERE root_tweet_id = ? ORDER BY position", (str(root_tweet_id),)
+        ).fetchall()
+        return [r[0] for r in rows] or [str(root_tweet_id)]
 
-    def add_id(self, tg_message_id, twitter_tweet_id):
-        self.posted_data[str(tg_message_id)] = str(twitter_tweet_id)
-        self._save_data()
+    def drop_thread(self, root_tweet_id):
+        self.conn.execute("DELETE FROM threads WHERE root_tweet_id = ?", (str(root_tweet_id),))
 
     def delete_id(self, tg_message_id):
         """Removes an ID from the database."""
-        if str(tg_message_id) in self.posted_data:
-            del self.posted_data[str(tg_message_id)]
-            self._save_data()
-            return True
-        return False
+        return self.delete_ids([tg_message_id]) > 0
 
-    def _save_data(self):
+    def delete_ids(self, tg_message_ids):
+        """
+        Removes several IDs in one transaction, plus the thread records of tweets
+        no message points to anymore. Returns the number of mappings removed.
+        """
+        ids = [(int(mid),) for mid in tg_message_ids]
+        if not ids:
+            return 0
         try:
-            with open(self.filepath, 'w', encoding='utf-8') as f:
-                json.dump(self.posted_data, f)
+            with self.conn:
+                self.conn.execute("BEGIN")
+                placeholders = ",".join("?" * len(ids))
+                roots = [r[0] for r in self.conn.execute(
+                    f"SELECT DISTINCT tweet_id FROM mappings WHERE tg_message_id IN ({placeholders})",
+                    [i for (i,) in ids]
+                )]
+                removed = self.conn.executemany("DELETE FROM mappings WHERE tg_message_id = ?", ids).rowcount
+                self.conn.executemany(
+                    "DELETE FROM threads WHERE root_tweet_id = ?"
+                    " AND NOT EXISTS (SELECT 1 FROM mappings WHERE tweet_id = ?)",
+                    [(root, root) for root in roots]
+                )
+            return removed
         except Exception as e:
-            logger.error(f"Failed to save ID data: {e}")
\ No newline at end of file
+            logger.error(f"Failed to delete ID data: {e}")
+            return 0
+
+    def get_max_message_id(self):
+        """Highest mirrored Telegram Message ID, or None for an empty store."""
+        return self.conn.execute("SELECT MAX(tg_message_id) FROM mappings").fetchone()[0]
+
+    def mark_ignored(self, tg_message_id):
+        """Records a message skipped while paused, so the backfill does not mirror it later."""
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('ignored_until', ?)"
+            " ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)", (tg_message_id,)
+        )
+
+    def get_ignored_until(self):
+        """Highest Message ID skipped while paused, or None."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'ignored_until'").fetchone()
+        return row[0] if row else None
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM mappings").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
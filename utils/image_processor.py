@@ -0,0 +1,120 @@
+import asyncio
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from core.logger import setup_logger
+from core.metrics import metrics
+
+logger = setup_logger()
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tif', '.tiff')
+
+def optimize_image(data, max_side, quality, image_format):
+    """
+    Runs in a worker process. Applies EXIF orientation, downscales to max_side,
+    and re-encodes without EXIF/XMP metadata (the ICC profile is kept).
+    Returns (bytes, extension), or None when the original is already the better upload.
+    """
+    from PIL import Image, ImageOps
+    with Image.open(io.BytesIO(data)) as image:
+        if getattr(image, "n_frames", 1) > 1:
+            return None
+        icc_profile = image.info.get("icc_profile")
+        image = ImageOps.exif_transpose(image)
+        resized = max(image.size) > max_side
+        if resized:
+            image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        out = io.BytesIO()
+        if image_format == "webp":
+            image.save(out, "WEBP", quality=quality, method=4, icc_profile=icc_profile)
+            ext = ".webp"
+        elif has_alpha:
+            image.save(out, "PNG", optimize=True, icc_profile=icc_profile)
+            ext = ".png"
+        else:
+            if image.mode == "CMYK":
+                icc_profile = None
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            image.save(out, "JPEG", quality=quality, optimize=True, progressive=True, icc_profile=icc_profile)
+            ext = ".jpg"
+
+    result = out.getvalue()
+    if len(result) >= len(data) and not resized:
+        return None
+    return result, ext
+
+class ImagePreprocessor:
+    """
+    Shrinks photos before upload: CPU work runs in a process pool so the event
+    loop and the Twitter threads stay free. Videos, GIFs and small images pass through.
+    """
+    def __init__(self, workers=2, max_side=4096, quality=85, image_format="jpeg", min_size=256 * 1024):
+        self.workers = workers
+        self.max_side = max_side
+        self.quality = quality
+        self.image_format = image_format
+        self.min_size = min_size
+        self.executor = None
+        self.processed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    def wants(self, buffer):
+        return buffer.name.lower().endswith(IMAGE_EXTENSIONS) and buffer.size >= self.min_size
+
+    async def process(self, buffer):
+        """Rewrites the buffer in place when re-encoding makes it smaller (or it had to be downscaled)."""
+        if not self.wants(buffer):
+            return buffer
+        if self.executor is None:
+            # spawn, not fork: the bot already runs Telethon, tweepy and notifier threads.
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+        loop = asyncio.get_running_loop()
+        original = await asyncio.to_thread(buffer.read_at, 0, buffer.size)
+        started = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(
+                self.executor, optimize_image, original, self.max_side, self.quality, self.image_format
+            )
+        except Exception as e:
+            metrics.inc("preprocess_errors")
+            logger.warning(f"Image preprocessing skipped for {buffer.name}: {e}")
+            return buffer
+        elapsed = time.perf_counter() - started
+        metrics.observe("preprocess", elapsed)
+        self.seconds += elapsed
+        if result is None:
+            return buffer
+
+        data, ext = result
+        with buffer.lock:
+            buffer.file.seek(0)
+            buffer.file.truncate()
+            buffer.file.write(data)
+        buffer.name = os.path.splitext(buffer.name)[0] + ext
+
+        self.processed += 1
+        self.bytes_in += len(original)
+        self.bytes_out += len(data)
+        metrics.inc("preprocess_bytes_saved", len(original) - len(data))
+        logger.info(f"Image {buffer.name}: {len(original) // 1024} KB -> {len(data) // 1024} KB in {elapsed:.2f}s")
+        return buffer
+
+    def stats(self):
+        return {
+            "processed": self.processed,
+            "saved": self.bytes_in - self.bytes_out,
+            "ratio": self.bytes_out / self.bytes_in if self.bytes_in else 1.0,
+            "seconds": self.seconds,
+        }
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,171 @@
+import json
+import random
+import sqlite3
+import time
+from core.logger import setup_logger
+
+logger = setup_logger()
+
+ACTIVE_STATES = ("pending", "running")
+
+class JobQueue:
+    """
+    Persistent outbound job queue (posts, edits, deletions) stored in SQLite.
+    Jobs survive crashes and restarts; `recover()` puts interrupted jobs back in line.
+    An idempotency key prevents the same job from being queued twice while it is active.
+    """
+    def __init__(self, db_path, max_attempts=5, retry_base=5, retry_cap=900):
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " kind TEXT NOT NULL,"
+            " idempotency_key TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " state TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_run_at REAL NOT NULL,"
+            " result TEXT,"
+            " last_error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs (state, next_run_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs (idempotency_key)")
+
+    @staticmethod
+    def _row_to_job(row):
+        if not row: return None
+        return {
+            "id": row[0], "kind": row[1], "key": row[2],
+            "payload": json.loads(row[3]), "attempts": row[4],
+            "result": json.loads(row[5]) if row[5] else {},
+        }
+
+    def enqueue(self, kind, payload, key, delay=0, dedupe_states=ACTIVE_STATES):
+        """
+        Queues a job unless one with the same key is in `dedupe_states`. Returns the job id.
+        Edits pass ('pending',): a running edit may already have read the older text.
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            row = self.conn.execute(
+                f"SELECT id FROM jobs WHERE idempotency_key = ? AND state IN ({', '.join('?' * len(dedupe_states))})",
+                (key, *dedupe_states)
+            ).fetchone()
+            if row:
+                return row[0]
+            cur = self.conn.execute(
+                "INSERT INTO jobs (kind, idempotency_key, payload, next_run_at, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, json.dumps(payload), now + delay, now, now)
+            )
+            return cur.lastrowid
+
+    def claim(self):
+        """Atomically takes the oldest due job and marks it running."""
+        now = time.time()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            row = self.conn.execute(
+                "SELECT id, kind, idempotency_key, payload, attempts, result FROM jobs"
+                " WHERE state = 'pending' AND next_run_at <= ? ORDER BY next_run_at, id LIMIT 1", (now,)
+            ).fetchone()
+            if not row:
+                return None
+            self.conn.execute("UPDATE jobs SET state = 'running', updated_at = ? WHERE id = ?", (now, row[0]))
+        return self._row_to_job(row)
+
+    def checkpoint(self, job_id, result):
+        """Stores partial progress (e.g. tweet ids of a half-posted thread) for a retry to pick up."""
+        self.conn.execute(
+            "UPDATE jobs SET result = ?, updated_at = ? WHERE id = ?", (json.dumps(result), time.time(), job_id)
+        )
+
+    def complete(self, job_id):
+        self.conn.execute("UPDATE jobs SET state = 'done', updated_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def fail(self, job_id, error):
+        """Schedules a retry with jittered exponential backoff. Returns the new state."""
+        row = self.conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        attempts = (row[0] if row else 0) + 1
+        now = time.time()
+        if attempts >= self.max_attempts:
+            state, next_run = "failed", now
+        else:
+            delay = min(self.retry_cap, self.retry_base * 2 ** (attempts - 1))
+            state, next_run = "pending", now + delay * random.uniform(0.5, 1.5)
+        self.conn.execute(
+            "UPDATE jobs SET state = ?, attempts = ?, next_run_at = ?, last_error = ?, updated_at = ? WHERE id = ?",
+            (state, attempts, next_run, str(error)[:500], now, job_id)
+        )
+        return state
+
+    def recover(self):
+        """Puts jobs that were running when the process died back into the queue."""
+        cur = self.conn.execute(
+            "UPDATE jobs SET state = 'pending', next_run_at = ?, updated_at = ? WHERE state = 'running'",
+            (time.time(), time.time())
+        )
+        if cur.rowcount:
+            logger.warning(f"Recovered {cur.rowcount} interrupted job(s).")
+        return cur.rowcount
+
+    def active_payloads(self, kind):
+        """Payloads of the pending and running jobs of one kind."""
+        rows = self.conn.execute(
+            "SELECT payload FROM jobs WHERE kind = ? AND state IN (?, ?)", (kind, *ACTIVE_STATES)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def drop_messages(self, kind, msg_ids):
+        """
+        Removes deleted messages from pending jobs that have not posted anything yet;
+        a job left with no messages is cancelled. Returns the ids of the jobs it changed.
+        """
+        msg_ids = set(msg_ids)
+        touched = []
+        now = time.time()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            rows = self.conn.execute(
+                "SELECT id, payload, result FROM jobs WHERE kind = ? AND state = 'pending'", (kind,)
+            ).fetchall()
+            for job_id, raw, result in rows:
+                if result and json.loads(result).get("tweet_ids"):
+                    continue
+                payload = json.loads(raw)
+                remaining = [mid for mid in payload["message_ids"] if mid not in msg_ids]
+                if len(remaining) == len(payload["message_ids"]):
+                    continue
+                payload["message_ids"] = remaining
+                self.conn.execute(
+                    "UPDATE jobs SET state = ?, payload = ?, updated_at = ? WHERE id = ?",
+                    ("pending" if remaining else "cancelled", json.dumps(payload), now, job_id)
+                )
+                touched.append(job_id)
+        return touched
+
+    def next_due_in(self):
+        row = self.conn.execute("SELECT MIN(next_run_at) FROM jobs WHERE state = 'pending'").fetchone()
+        if not row or row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def stats(self):
+        rows = self.conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return dict(rows)
+
+    def purge(self, older_than):
+        """Drops finished jobs older than `older_than` seconds."""
+        self.conn.execute(
+            "DELETE FROM jobs WHERE state IN ('done', 'failed', 'cancelled') AND updated_at < ?", (time.time() - older_than,)
+        )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,35 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+class KeyedLock:
+    """
+    One asyncio lock per key, created on demand and dropped once nobody holds or waits
+    for it. hold(keys) takes several keys in sorted order, so callers cannot deadlock.
+    """
+    def __init__(self):
+        self.locks = {}
+
+    @asynccontextmanager
+    async def hold(self, keys):
+        keys = sorted(set(keys))
+        entries = []
+        for key in keys:
+            entry = self.locks.setdefault(key, [asyncio.Lock(), 0])
+            entry[1] += 1
+            entries.append((key, entry))
+        acquired = []
+        try:
+            for _, entry in entries:
+                await entry[0].acquire()
+                acquired.append(entry)
+            yield
+        finally:
+            for entry in acquired:
+                entry[0].release()
+            for key, entry in entries:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.locks[key]
+
+    def __len__(self):
+        return len(self.locks)
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import threading
+from core.logger import setup_logger
+
+logger = setup_logger()
+
+class MemoryBudget:
+    """Caps the bytes held in RAM by all media buffers together."""
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def try_reserve(self, size):
+        with self.lock:
+            if self.used + size > self.limit:
+                return False
+            self.used += size
+            return True
+
+    def release(self, size):
+        with self.lock:
+            self.used = max(0, self.used - size)
+
+class MediaBuffer:
+    """
+    A downloaded media item. Small items stay in memory; anything above the spool limit
+    (or beyond the shared memory budget) spills to an anonymous file in temp_dir,
+    which the OS removes on close.
+    """
+    def __init__(self, name, file, budget=None, reserved=0):
+        self.name = name
+        self.file = file
+        self.budget = budget
+        self.reserved = reserved
+        self.lock = threading.Lock()
+
+    @classmethod
+    def create(cls, name, expected_size, budget, spool_limit, temp_dir):
+        reserve = min(expected_size or spool_limit, spool_limit)
+        if reserve and (expected_size or 0) <= spool_limit and budget.try_reserve(reserve):
+            return cls(name, tempfile.SpooledTemporaryFile(max_size=reserve, dir=temp_dir), budget, reserve)
+        return cls(name, tempfile.TemporaryFile(dir=temp_dir))
+
+    @classmethod
+    def for_message(cls, message, budget, spool_limit, temp_dir):
+        file = message.file
+        ext = (file.ext if file else None) or ''
+        name = (file.name if file else None) or f"{message.id}{ext}"
+        return cls.create(name, file.size if file else None, budget, spool_limit, temp_dir)
+
+    @classmethod
+    def from_path(cls, path):
+        """Wraps an existing file (e.g. a media cache entry) read-only."""
+        return cls(os.path.basename(path), open(path, 'rb'))
+
+    @property
+    def in_memory(self):
+        return self.reserved > 0 and not getattr(self.file, '_rolled', False)
+
+    @property
+    def size(self):
+        with self.lock:
+            self.file.seek(0, 2)
+            return self.file.tell()
+
+    @property
+    def is_video(self):
+        return self.name.lower().endswith(('.mp4', '.mov', '.gif'))
+
+    def read_at(self, offset, size):
+        with self.lock:
+            self.file.seek(offset)
+            return self.file.read(size)
+
+    def reset(self):
+        with self.lock:
+            self.file.seek(0)
+            self.file.truncate()
+
+    def close(self):
+        try:
+            self.file.close()
+        finally:
+            if self.reserved:
+                self.budget.release(self.reserved)
+                self.reserved = 0
@@ -0,0 +1,111 @@
+import os
+import shutil
+import sqlite3
+import time
+from telethon.tl.types import MessageMediaDocument, MessageMediaPhoto
+from core.logger import setup_logger
+
+logger = setup_logger()
+
+class MediaCache:
+    """
+    Maps Telegram media (id + access hash) to its uploaded Twitter media_id and,
+    optionally, to a local copy. Lets edit-sync reuse media instead of downloading
+    and uploading it again. Local copies are evicted LRU once max_bytes is exceeded.
+    One cache per X account (media ids belong to the account): the index lives in
+    cache_dir next to the copies, and all routes of the account share it.
+    """
+    def __init__(self, cache_dir, max_bytes=0, media_ttl=23 * 3600):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.media_ttl = media_ttl
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS media_cache ("
+            " media_key TEXT PRIMARY KEY,"
+            " media_id TEXT,"
+            " expires_at REAL NOT NULL DEFAULT 0,"
+            " file_path TEXT,"
+            " size INTEGER NOT NULL DEFAULT 0,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_media_cache_used ON media_cache (last_used)")
+
+    @staticmethod
+    def key_for(message):
+        media = message.media
+        if isinstance(media, MessageMediaPhoto) and media.photo:
+            return f"photo:{media.photo.id}:{media.photo.access_hash}"
+        if isinstance(media, MessageMediaDocument) and media.document:
+            return f"doc:{media.document.id}:{media.document.access_hash}"
+        return None
+
+    def get_media_id(self, key):
+        """Returns a still-valid Twitter media_id for this media, or None."""
+        if not key: return None
+        row = self.conn.execute(
+            "SELECT media_id, expires_at FROM media_cache WHERE media_key = ?", (key,)
+        ).fetchone()
+        if row and row[0] and row[1] > time.time():
+            self.hits += 1
+            self.conn.execute("UPDATE media_cache SET last_used = ? WHERE media_key = ?", (time.time(), key))
+            return row[0]
+        self.misses += 1
+        return None
+
+    def get_local_path(self, key):
+        if not key: return None
+        row = self.conn.execute("SELECT file_path FROM media_cache WHERE media_key = ?", (key,)).fetchone()
+        if row and row[0] and os.path.exists(row[0]):
+            self.conn.execute("UPDATE media_cache SET last_used = ? WHERE media_key = ?", (time.time(), key))
+            return row[0]
+        return None
+
+    def put(self, key, media_id, buffer=None):
+        """Records the media_id; keeps a local copy of the buffer when disk caching is enabled."""
+        if not key: return
+        file_path, size = self.get_local_path(key), 0
+        if buffer is not None and self.max_bytes and not file_path:
+            file_path = os.path.join(self.cache_dir, key.replace(':', '_') + os.path.splitext(buffer.name)[1])
+            try:
+                with buffer.lock, open(file_path, 'wb') as f:
+                    buffer.file.seek(0)
+                    shutil.copyfileobj(buffer.file, f)
+                size = os.path.getsize(file_path)
+            except Exception as e:
+                logger.error(f"Failed to cache media {key}: {e}")
+                file_path = None
+        elif file_path:
+            size = os.path.getsize(file_path)
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO media_cache (media_key, media_id, expires_at, file_path, size, last_used)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (key, str(media_id), time.time() + self.media_ttl, file_path, size, time.time())
+        )
+        self._evict()
+
+    def _evict(self):
+        now = time.time()
+        self.conn.execute("DELETE FROM media_cache WHERE expires_at <= ? AND file_path IS NULL", (now,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM media_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute(
+            "SELECT media_key, file_path, size FROM media_cache WHERE file_path IS NOT NULL ORDER BY last_used"
+        ).fetchall()
+        for key, file_path, size in rows:
+            if total <= self.max_bytes: break
+            try:
+                if os.path.exists(file_path): os.remove(file_path)
+            except OSError:
+                pass
+            self.conn.execute("UPDATE media_cache SET file_path = NULL, size = 0 WHERE media_key = ?", (key,))
+            total -= size
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+
+class MessageIndex:
+    """
+    Bounded LRU of recent channel messages, filled from the events we already
+    receive. Lets edit-sync and album lookups skip a Telegram round-trip;
+    callers fall back to get_messages on a miss. Messages are kept whole since
+    posting and edit-sync need their text and media, plus an album id -> ids map.
+    """
+    def __init__(self, capacity=2000):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.groups = {}
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, message):
+        if not message or message.id is None:
+            return
+        self._drop(message.id)
+        self.entries[message.id] = message
+        if message.grouped_id:
+            self.groups.setdefault(message.grouped_id, set()).add(message.id)
+        while len(self.entries) > self.capacity:
+            self._drop(next(iter(self.entries)))
+
+    def add_many(self, messages):
+        for message in messages:
+            self.add(message)
+
+    def _drop(self, msg_id):
+        message = self.entries.pop(msg_id, None)
+        if message and message.grouped_id:
+            members = self.groups.get(message.grouped_id)
+            if members is not None:
+                members.discard(msg_id)
+                if not members:
+                    del self.groups[message.grouped_id]
+
+    def discard(self, msg_ids):
+        for msg_id in msg_ids:
+            self._drop(msg_id)
+
+    def get(self, msg_id):
+        message = self.entries.get(msg_id)
+        if message is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(msg_id)
+        self.hits += 1
+        return message
+
+    def get_many(self, msg_ids):
+        """All requested messages, or None if any of them is not indexed."""
+        messages = []
+        for msg_id in msg_ids:
+            message = self.get(msg_id)
+            if message is None:
+                return None
+            messages.append(message)
+        return messages
+
+    def get_group(self, grouped_id):
+        """Indexed members of an album, sorted by id (may be incomplete)."""
+        ids = sorted(self.groups.get(grouped_id, ()))
+        if not ids:
+            self.misses += 1
+            return []
+        return self.get_many(ids) or []
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
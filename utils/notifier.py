@@ -1,33 +1,146 @@
-import requests
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from core.env_loader import Config
 from core.logger import setup_logger
+from core.metrics import metrics
 
 logger = setup_logger()
 
+MAX_MESSAGE_LENGTH = 4096
+SEPARATOR = "\n\n➖➖➖\n\n"
+
+class LogNotifier:
+    """
+    Non-blocking log channel notifier.
+    Messages are queued and coalesced within `window` seconds into as few Telegram
+    messages as possible (each under 4096 chars). ERROR messages skip the batch.
+    HTTP calls run on one background thread over a persistent session.
+    """
+    def __init__(self, token, chat_id, window=2.0, max_queue=500):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.window = window
+        self.max_queue = max_queue
+        self.queue = deque()
+        import requests
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notifier")
+        self.lock = threading.Lock()
+        self.flush_task = None
+        self.sent = 0
+        self.dropped = 0
+        metrics.register(lambda: [
+            ("notifier_queued", {}, len(self.queue)),
+            ("notifier_sent", {}, self.sent),
+            ("notifier_dropped", {}, self.dropped),
+        ])
+
+    @staticmethod
+    def format(message, level):
+        emoji = "ℹ️"
+        if level == "ERROR": emoji = "🚨"
+        elif level == "WARNING": emoji = "⚠️"
+        elif level == "SUCCESS": emoji = "✅"
+        elif level == "START": emoji = "🚀"
+        return f"{emoji} **[{level}]**\n\n{message}"[:MAX_MESSAGE_LENGTH]
+
+    def send(self, message, level="INFO"):
+        text = self.format(message, level)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is None:
+            # No event loop (startup/shutdown): deliver whatever is queued, then this one.
+            self.flush()
+            self._post(text)
+            return
+
+        if level == "ERROR":
+            loop.run_in_executor(self.executor, self._post, text)
+            return
+
+        with self.lock:
+            if len(self.queue) >= self.max_queue:
+                self.dropped += 1
+                return
+            self.queue.append(text)
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        # Runs until the queue is empty: messages sent while a batch is being posted
+        # see this task still alive and rely on it to pick them up.
+        loop = asyncio.get_running_loop()
+        while self.queue:
+            await asyncio.sleep(self.window)
+            for batch in self._drain():
+                await loop.run_in_executor(self.executor, self._post, batch)
+
+    def _drain(self):
+        """Empties the queue into batches that each fit in one Telegram message."""
+        with self.lock:
+            items = list(self.queue)
+            self.queue.clear()
+        batches, current = [], ""
+        for text in items:
+            candidate = f"{current}{SEPARATOR}{text}" if current else text
+            if len(candidate) > MAX_MESSAGE_LENGTH:
+                batches.append(current)
+                current = text
+            else:
+                current = candidate
+        if current: batches.append(current)
+        return batches
+
+    def flush(self):
+        for batch in self._drain():
+            self._post(batch)
+
+    def _post(self, text):
+        data = {"chat_id": self.chat_id, "text": text, "parse_mode": "Markdown"}
+        for _ in range(2):
+            try:
+                with metrics.timer("notifier_send"):
+                    response = self.session.post(self.url, data=data, timeout=5)
+                if response.status_code == 429:
+                    retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+                    time.sleep(min(retry_after, 30))
+                    continue
+                self.sent += 1
+                return
+            except Exception as e:
+                logger.error(f"Log could not be sent: {e}")
+                return
+        self.dropped += 1
+
+    def stats(self):
+        return {"queued": len(self.queue), "sent": self.sent, "dropped": self.dropped}
+
+_notifier = None
+
+def get_notifier():
+    global _notifier
+    if _notifier is None and Config.LOG_CHANNEL_ID:
+        _notifier = LogNotifier(Config.TG_BOT_TOKEN, Config.LOG_CHANNEL_ID, window=Config.LOG_BATCH_WINDOW)
+    return _notifier
+
+def reset_notifier():
+    """Drops the notifier so the next send_log uses reloaded settings; queued messages are still sent."""
+    global _notifier
+    if _notifier is not None:
+        _notifier.executor.submit(_notifier.flush)
+        _notifier = None
+
 def send_log(message, level="INFO"):
     """
     Sends a message to the specified log channel.
     Level: INFO (Green/Normal), ERROR (Red/Error), WARNING (Yellow/Warning)
     """
-    if not Config.LOG_CHANNEL_ID:
-        return
-
-    emoji = "ℹ️"
-    if level == "ERROR": emoji = "🚨"
-    elif level == "WARNING": emoji = "⚠️"
-    elif level == "SUCCESS": emoji = "✅"
-    elif level == "START": emoji = "🚀"
-
-    formatted_msg = f"{emoji} **[{level}]**\n\n{message}"
-
-    url = f"https://api.telegram.org/bot{Config.TG_BOT_TOKEN}/sendMessage"
-    data = {
-        "chat_id": Config.LOG_CHANNEL_ID,
-        "text": formatted_msg,
-        "parse_mode": "Markdown" 
-    }
-
-    try:
-        requests.post(url, data=data, timeout=5)
-    except Exception as e:
-        logger.error(f"Log could not be sent: {e}")
\ No newline at end of file
+    notifier = get_notifier()
+    if notifier:
+        notifier.send(message, level)
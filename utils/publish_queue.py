@@ -0,0 +1,142 @@
+import json
+import sqlite3
+import time
+from core.logger import setup_logger
+
+logger = setup_logger()
+
+class PublishQueue:
+    """
+    SQLite-backed hand-off between the ingest process and the publisher processes.
+    The ingest process submits Twitter calls (uploads, posts, deletions) and collects
+    their results; publisher processes claim, execute and answer them. Thread progress
+    is written back after every part, so the ingest side can checkpoint it as it happens.
+    """
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS publish_tasks ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " account TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " priority INTEGER NOT NULL,"
+            " state TEXT NOT NULL DEFAULT 'pending',"
+            " worker INTEGER,"
+            " progress TEXT,"
+            " result TEXT,"
+            " updated_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_publish_due ON publish_tasks (state, priority, id)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS publish_workers ("
+            " worker INTEGER NOT NULL,"
+            " account TEXT NOT NULL,"
+            " headroom TEXT NOT NULL,"
+            " waiting TEXT NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (worker, account))"
+        )
+
+    def reset(self):
+        """Drops tasks left over from a previous run; their jobs are retried from the job queue."""
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            cur = self.conn.execute("DELETE FROM publish_tasks")
+            self.conn.execute("DELETE FROM publish_workers")
+        if cur.rowcount:
+            logger.warning(f"Dropped {cur.rowcount} unfinished publish task(s) from the previous run.")
+
+    # --- ingest side ---
+
+    def submit(self, account, kind, payload, priority):
+        cur = self.conn.execute(
+            "INSERT INTO publish_tasks (account, kind, payload, priority, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (account, kind, json.dumps(payload), priority, time.time())
+        )
+        return cur.lastrowid
+
+    def poll(self, task_ids):
+        """(id, state, progress, result) of the given tasks that finished or reported progress."""
+        rows = []
+        task_ids = list(task_ids)
+        for start in range(0, len(task_ids), 500):
+            chunk = task_ids[start:start + 500]
+            rows += self.conn.execute(
+                f"SELECT id, state, progress, result FROM publish_tasks WHERE id IN ({','.join('?' * len(chunk))})"
+                " AND (state IN ('done', 'error') OR progress IS NOT NULL)", chunk
+            ).fetchall()
+        return [
+            (task_id, state, json.loads(progress) if progress else None, json.loads(result) if result else None)
+            for task_id, state, progress, result in rows
+        ]
+
+    def remove(self, task_ids):
+        self.conn.executemany("DELETE FROM publish_tasks WHERE id = ?", [(t,) for t in task_ids])
+
+    def cancel(self, task_id):
+        """Withdraws a task nobody has claimed yet."""
+        self.conn.execute("DELETE FROM publish_tasks WHERE id = ? AND state = 'pending'", (task_id,))
+
+    def recover(self, worker):
+        """Hands the tasks of a dead publisher process to the others; posts resume from their progress."""
+        cur = self.conn.execute(
+            "UPDATE publish_tasks SET state = 'pending', worker = NULL, updated_at = ? WHERE state = 'running' AND worker = ?",
+            (time.time(), worker)
+        )
+        return cur.rowcount
+
+    def pending(self):
+        return self.conn.execute("SELECT COUNT(*) FROM publish_tasks WHERE state IN ('pending', 'running')").fetchone()[0]
+
+    def worker_status(self, account, max_age=15):
+        """[(headroom, waiting)] reported by the live publisher processes for an account."""
+        rows = self.conn.execute(
+            "SELECT headroom, waiting FROM publish_workers WHERE account = ? AND updated_at >= ?",
+            (account, time.time() - max_age)
+        ).fetchall()
+        return [(json.loads(headroom), json.loads(waiting)) for headroom, waiting in rows]
+
+    # --- publisher side ---
+
+    def claim(self, worker):
+        """Atomically takes the most urgent pending task (deletions first, then oldest)."""
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            row = self.conn.execute(
+                "SELECT id, account, kind, payload, priority, progress FROM publish_tasks"
+                " WHERE state = 'pending' ORDER BY priority, id LIMIT 1"
+            ).fetchone()
+            if not row:
+                return None
+            self.conn.execute(
+                "UPDATE publish_tasks SET state = 'running', worker = ?, updated_at = ? WHERE id = ?",
+                (worker, time.time(), row[0])
+            )
+        return {
+            "id": row[0], "account": row[1], "kind": row[2], "payload": json.loads(row[3]),
+            "priority": row[4], "progress": json.loads(row[5]) if row[5] else None,
+        }
+
+    def report_progress(self, task_id, progress):
+        self.conn.execute(
+            "UPDATE publish_tasks SET progress = ?, updated_at = ? WHERE id = ?",
+            (json.dumps(progress), time.time(), task_id)
+        )
+
+    def finish(self, task_id, result, state="done"):
+        self.conn.execute(
+            "UPDATE publish_tasks SET state = ?, result = ?, updated_at = ? WHERE id = ?",
+            (state, json.dumps(result), time.time(), task_id)
+        )
+
+    def heartbeat(self, worker, account, headroom, waiting):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO publish_workers (worker, account, headroom, waiting, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (worker, account, json.dumps(headroom), json.dumps(waiting), time.time())
+        )
+
+    def close(self):
+        self.conn.close()
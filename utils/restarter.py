@@ -1,22 +1,26 @@
+import os
 import sys
-import time
-from .notifier import send_log
-from core.logger import setup_logger
+from .notifier import get_notifier
+from core.logger import setup_logger, shutdown_logging
 
 logger = setup_logger()
 
 def restart_bot():
     """
-    Safely shuts down the bot.
-    Docker automatically restarts thanks to the 'restart: always' policy.
+    Replaces the process with a fresh one (same interpreter and arguments) once the
+    listener has drained, so the container keeps running. If exec fails the bot exits
+    and Docker restarts it thanks to the 'restart: always' policy.
     """
-    logger.warning("Restart command received. Shutting down...")
+    logger.warning("Restarting process...")
     
     try:
-        send_log("🔄 System is restarting via admin command...", "WARNING")
-        time.sleep(1)
+        notifier = get_notifier()
+        if notifier: notifier.flush()
     except:
         pass
 
-    
-    sys.exit(1)
\ No newline at end of file
+    shutdown_logging()
+    try:
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+    except OSError:
+        sys.exit(1)
\ No newline at end of file